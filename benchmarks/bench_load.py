@@ -0,0 +1,182 @@
+"""Drives the real game with synthetic clicks and key presses, uncapped, and reports the cost of each game state.
+
+Runs headless under SDL's dummy drivers. Each frame, a synthetic player posts the events a fast player might: menu
+navigation, random card flips, and pausing. The first pass times frames; the second repeats the run under tracemalloc
+to measure the memory each state allocates per frame, and the blocks still allocated at the end of each stretch of
+frames in one state, from comparing tracemalloc snapshots taken whenever the state changes. Usage from the repository
+root:
+
+    python -m benchmarks.bench_load [--scenario mixed|menus|flips|pause] [--frames N] [--seed S]
+"""
+import os
+import sys
+import time
+import random
+import typing
+import argparse
+import tracemalloc
+import collections
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame as pg
+
+import src.config as cfg
+import src.services.preloader as preloader
+from src.game import Game
+from src.game_state import GameMainMenuState, GamePlayingState
+
+# Chance per frame of each action in each scenario: clicking a menu button, flipping a card, and pressing 'p'.
+SCENARIOS = {
+    'mixed': {'menu': 0.3, 'flip': 0.5, 'pause': 0.02},
+    'menus': {'menu': 0.9, 'flip': 0.0, 'pause': 0.3},
+    'flips': {'menu': 0.3, 'flip': 0.9, 'pause': 0.0},
+    'pause': {'menu': 0.1, 'flip': 0.2, 'pause': 0.5},
+}
+
+
+class SyntheticPlayer:
+    """Posts the events of one action per frame, chosen at random according to the state of the game."""
+    def __init__(self, rates: typing.Dict[str, float], rng: random.Random):
+        self._rates = rates
+        self._rng = rng
+
+    def act(self, game: Game) -> None:
+        state = game.state
+        menu = game.ui.top_menu
+        rng = self._rng
+        if isinstance(state, GamePlayingState):
+            if rng.random() < self._rates['pause'] and not state.memory_game.is_won:
+                self._press(pg.K_p)
+            elif menu:
+                if rng.random() < self._rates['menu']:
+                    self._click(rng.choice(menu.buttons).rect.center)
+            elif rng.random() < self._rates['flip']:
+                self._click(state.card_rect(rng.randrange(len(state.memory_game))).center)
+        elif isinstance(state, GameMainMenuState) and menu and rng.random() < self._rates['menu']:
+            buttons = menu.buttons
+            # The main menu's second button exits the game; only the difficulty menu's buttons are all safe.
+            self._click((buttons[0] if len(buttons) == 2 else rng.choice(buttons)).rect.center)
+        elif rng.random() < 0.5:
+            self._move((rng.randrange(cfg.SCREEN_WIDTH), rng.randrange(cfg.SCREEN_HEIGHT)))
+
+    @staticmethod
+    def _move(pos) -> None:
+        pg.event.post(pg.event.Event(pg.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+
+    @staticmethod
+    def _click(pos) -> None:
+        SyntheticPlayer._move(pos)
+        pg.event.post(pg.event.Event(pg.MOUSEBUTTONDOWN, pos=pos, button=1))
+        pg.event.post(pg.event.Event(pg.MOUSEBUTTONUP, pos=pos, button=1))
+
+    @staticmethod
+    def _press(key: int) -> None:
+        pg.event.post(pg.event.Event(pg.KEYDOWN, key=key, mod=0))
+        pg.event.post(pg.event.Event(pg.KEYUP, key=key, mod=0))
+
+
+class StateStats:
+    """Frame times and memory allocated by the frames that began in one game state."""
+    def __init__(self):
+        self.times = []
+        self.peak_bytes = 0
+        self.net_bytes = 0
+        self.traced_frames = 0
+        # Blocks allocated, and not freed, over the stretches of frames spent in the state.
+        self.new_blocks = 0
+
+
+def _run(game: Game, rates: dict, frames: int, seed: int, stats: typing.Dict[str, StateStats], trace: bool) -> float:
+    """Plays 'frames' frames from the main menu, adding each frame's cost to the stats of the state it began in."""
+    player = SyntheticPlayer(rates, random.Random(seed))
+    game.rng.seed(seed)
+    game.state = game.main_menu_state
+    start = time.perf_counter()
+    # Snapshot at the start of the current stretch of frames in one state, and that state's name.
+    snapshot, stretch = (_snapshot(), type(game.state).__name__) if trace else (None, None)
+    for _ in range(frames):
+        name = type(game.state).__name__
+        if trace and name != stretch:
+            snapshot = _count_blocks(snapshot, stats[stretch])
+            stretch = name
+        player.act(game)
+        if trace:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            game.frame()
+            current, peak = tracemalloc.get_traced_memory()
+            state_stats = stats[name]
+            state_stats.peak_bytes += peak - before
+            state_stats.net_bytes += current - before
+            state_stats.traced_frames += 1
+        else:
+            frame_start = time.perf_counter()
+            game.frame()
+            stats[name].times.append(time.perf_counter() - frame_start)
+    if trace:
+        _count_blocks(snapshot, stats[stretch])
+    return time.perf_counter() - start
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Takes a snapshot of the traced memory, leaving out what tracemalloc itself allocated."""
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def _count_blocks(snapshot: tracemalloc.Snapshot, state_stats: StateStats) -> tracemalloc.Snapshot:
+    """Adds the blocks allocated since the snapshot, by the lines that allocated more than they freed, to the stats.
+
+    :return: A new snapshot, to compare the next stretch of frames with.
+    """
+    current = _snapshot()
+    state_stats.new_blocks += sum(stat.count_diff for stat in current.compare_to(snapshot, 'lineno')
+                                  if stat.count_diff > 0)
+    return current
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Drive the game with synthetic input and report per-state costs.")
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='mixed')
+    parser.add_argument('--frames', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    cfg.FPS = 0  # Uncapped.
+    cfg.IDLE_WAIT = False
+    cfg.RECORD_INPUT = False
+
+    game = Game(seed=args.seed)
+    preloader.finish()
+    game.start()
+    rates = SCENARIOS[args.scenario]
+    stats = collections.defaultdict(StateStats)
+    # Warm the caches, as a player's first minute would, so that the passes measure steady-state frames.
+    _run(game, rates, min(args.frames, 500), args.seed + 1, collections.defaultdict(StateStats), trace=False)
+    seconds = _run(game, rates, args.frames, args.seed, stats, trace=False)
+    tracemalloc.start()
+    _run(game, rates, args.frames, args.seed, stats, trace=True)
+    top = tracemalloc.take_snapshot().statistics('lineno')[:5]
+    tracemalloc.stop()
+
+    print(f"scenario {args.scenario}: {args.frames} frames in {seconds:.2f} s, {args.frames / seconds:.0f} FPS")
+    print(f"{'state':<20} {'frames':>7} {'mean ms':>8} {'p95 ms':>8} {'max ms':>8} {'FPS':>8} "
+          f"{'peak KiB':>9} {'net B':>8} {'blocks':>7}")
+    for name, state_stats in sorted(stats.items()):
+        times = sorted(state_stats.times)
+        if not times:
+            continue
+        mean = sum(times) / len(times)
+        p95 = times[max(0, int(len(times) * 0.95) - 1)]
+        traced = max(1, state_stats.traced_frames)
+        print(f"{name:<20} {len(times):>7} {mean * 1000:>8.3f} {p95 * 1000:>8.3f} {times[-1] * 1000:>8.3f} "
+              f"{1 / mean:>8.0f} {state_stats.peak_bytes / traced / 1024:>9.1f} "
+              f"{state_stats.net_bytes / traced:>8.0f} {state_stats.new_blocks / traced:>7.2f}")
+    print("\nLargest allocation sites still alive after the traced pass:")
+    for stat in top:
+        print(f"  {stat}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,63 @@
+"""Compares frame times of full-screen flips against dirty-rect updates in the playing state.
+
+Runs headless under SDL's dummy drivers. Usage from the repository root:
+
+    python -m benchmarks.bench_render [frames]
+"""
+import os
+import sys
+import time
+import random
+import statistics
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame as pg
+
+import src.config as cfg
+from src.game import Game
+from src.game_state import GamePlayingState
+
+# Flip a card every so many frames, roughly a fast player at 30 FPS.
+_FLIP_EVERY = 10
+
+
+def _frame_times(game: Game, difficulty: str, frames: int) -> list:
+    """Plays 'frames' frames at the given difficulty and returns the duration of each in milliseconds."""
+    state = GamePlayingState(game, difficulty)
+    game.state = state
+    rng = random.Random(0)
+    times = []
+    for i in range(frames):
+        if i % _FLIP_EVERY == 0:
+            # Deal a new board once every pair is found, so flips keep changing the screen.
+            if state.memory_game.is_won:
+                state.enter()
+            # Clicking flips back a wrong guess being shown, then flips the card clicked.
+            pos = state.card_rect(rng.randrange(len(state.memory_game))).center
+            pg.event.post(pg.event.Event(pg.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+            pg.event.post(pg.event.Event(pg.MOUSEBUTTONDOWN, pos=pos, button=1))
+            pg.event.post(pg.event.Event(pg.MOUSEBUTTONUP, pos=pos, button=1))
+        start = time.perf_counter()
+        game.frame()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main(frames: int = 300) -> None:
+    cfg.FPS = 0  # Uncapped.
+    cfg.IDLE_WAIT = False
+    game = Game()
+    print(f"{'difficulty':<10} {'mode':<10} {'mean ms':>9} {'p95 ms':>9}")
+    for difficulty in cfg.PAIRS_BY_DIFFICULTY:
+        for dirty in (False, True):
+            cfg.DIRTY_RECTS = dirty
+            times = sorted(_frame_times(game, difficulty, frames))
+            p95 = times[int(len(times) * 0.95) - 1]
+            mode = 'dirty' if dirty else 'full'
+            print(f"{difficulty:<10} {mode:<10} {statistics.mean(times):>9.3f} {p95:>9.3f}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,67 @@
+"""Measures import time, time-to-first-frame and time-to-interactive-menu in fresh interpreters.
+
+Runs headless under SDL's dummy drivers. Usage from the repository root:
+
+    python -m benchmarks.bench_startup [runs]
+"""
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter per sample so nothing is already imported, loaded or cached in memory.
+_PROBE = r'''
+import time
+start = time.perf_counter()
+import src.card
+card_model = time.perf_counter()
+import pygame as pg
+window_opened = pg.display.get_init()
+import src.config as cfg
+from src.game import Game
+imported = time.perf_counter()
+cfg.FPS = 0
+cfg.IDLE_WAIT = False
+game = Game()
+game.start()
+game.frame()
+first_frame = time.perf_counter()
+# The frame that moves on to the main menu also draws it.
+while game.state is not game.main_menu_state:
+    game.frame()
+# The menu is interactive once it has handled the player's first input, here the mouse moving over it.
+center = (cfg.SCREEN_WIDTH // 2, cfg.SCREEN_HEIGHT // 2)
+pg.event.post(pg.event.Event(pg.MOUSEMOTION, pos=center, rel=(0, 0), buttons=(0, 0, 0)))
+game.frame()
+interactive = time.perf_counter()
+print(json.dumps({
+    'import_card_model': card_model - start,
+    'import_game': imported - start,
+    'first_frame': first_frame - start,
+    'interactive_menu': interactive - start,
+    'card_model_opened_window': window_opened,
+}))
+'''
+
+
+def _sample() -> dict:
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    out = subprocess.run([sys.executable, '-c', 'import json\n' + _PROBE], cwd=_ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(runs: int = 5) -> None:
+    samples = [_sample() for _ in range(runs)]
+    for key in ('import_card_model', 'import_game', 'first_frame', 'interactive_menu'):
+        times = [sample[key] * 1000 for sample in samples]
+        print(f"{key:<20} median {statistics.median(times):>9.2f} ms   min {min(times):>9.2f} ms")
+    if any(sample['card_model_opened_window'] for sample in samples):
+        print("warning: importing the card model initialized the display")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
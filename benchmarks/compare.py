@@ -0,0 +1,75 @@
+"""Compares two benchmark result files written by the pytest benchmark suite, flagging slowdowns.
+
+Usage from the repository root:
+
+    python -m benchmarks.compare BASELINE.json [RESULTS.json] [--threshold PERCENT] [--stat min|median|mean]
+
+RESULTS.json defaults to the newest file in .cache/benchmarks. Exits with status 1 if any benchmark got slower by
+more than the threshold, so it can gate a build.
+"""
+import os
+import sys
+import glob
+import json
+import typing
+import argparse
+
+import src.config as cfg
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _latest() -> str:
+    paths = glob.glob(os.path.join(cfg.CACHE_DIR, 'benchmarks', '*.json'))
+    if not paths:
+        raise SystemExit("no benchmark results found; run: python -m pytest benchmarks")
+    return max(paths, key=os.path.getmtime)
+
+
+def compare(baseline: dict, results: dict, threshold: float, stat: str = 'min') -> typing.List[str]:
+    """ Prints each benchmark's time in both result sets and the change between them.
+
+    :param baseline: Results to compare against.
+    :param results: Newer results.
+    :param threshold: Percent slowdown above which a benchmark counts as a regression.
+    :param stat: Statistic compared: 'min', which is the least noisy, 'median' or 'mean'.
+    :return: Names of the benchmarks that regressed.
+    """
+    old, new = baseline['benchmarks'], results['benchmarks']
+    print(f"{baseline.get('commit', '?')} -> {results.get('commit', '?')}, comparing {stat}, threshold {threshold:g}%")
+    print(f"{'benchmark':<50} {'before':>12} {'after':>12} {'change':>8}")
+    regressions = []
+    for name in sorted(set(old) | set(new)):
+        if name not in old or name not in new:
+            before = f"{old[name][stat] * 1e6:.2f}us" if name in old else '-'
+            after = f"{new[name][stat] * 1e6:.2f}us" if name in new else '-'
+            print(f"{name:<50} {before:>12} {after:>12} {'':>8}")
+            continue
+        before, after = old[name][stat], new[name][stat]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  SLOWER'
+        print(f"{name:<50} {before * 1e6:>10.2f}us {after * 1e6:>10.2f}us {change:>+7.1f}%{flag}")
+    return regressions
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument('baseline')
+    parser.add_argument('results', nargs='?', default=None)
+    parser.add_argument('--threshold', type=float, default=10.0, help="percent slowdown that counts as a regression")
+    parser.add_argument('--stat', choices=('min', 'median', 'mean'), default='min')
+    args = parser.parse_args(argv)
+    regressions = compare(_load(args.baseline), _load(args.results or _latest()), args.threshold, args.stat)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower by more than {args.threshold:g}%")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
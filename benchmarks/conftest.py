@@ -0,0 +1,99 @@
+"""Headless benchmark suite: times small pieces of the game and saves the results as JSON for compare.py.
+
+Usage from the repository root:
+
+    python -m pytest benchmarks [--bench-json PATH] [--bench-time SECONDS]
+
+Results go to PATH, or by default to .cache/benchmarks/<commit>.json.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+
+import pytest
+import pygame as pg
+
+import src.config as cfg
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Number of timed rounds per benchmark; each round repeats the code enough times to take a measurable time.
+_ROUNDS = 15
+
+# Results of the benchmarks run in this session, by name.
+_results = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('bench')
+    group.addoption('--bench-json', default=None, help="file to write benchmark results to")
+    group.addoption('--bench-time', type=float, default=0.01, help="target seconds per timed round")
+
+
+class Bench:
+    """Times a function over several rounds and records the result under the benchmark's name."""
+    def __init__(self, name: str, round_time: float):
+        self._name = name
+        self._round_time = round_time
+
+    def __call__(self, func, *args):
+        """ Times func(*args).
+
+        :return: The value of the last call to func, so tests can check it.
+        """
+        # Calibrate the number of calls per round so that timer resolution does not matter.
+        iterations = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                result = func(*args)
+            elapsed = time.perf_counter() - start
+            if elapsed >= self._round_time or iterations >= 1 << 20:
+                break
+            iterations *= 2 if elapsed < self._round_time / 10 else max(2, int(self._round_time / elapsed) + 1)
+        times = []
+        for _ in range(_ROUNDS):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                result = func(*args)
+            times.append((time.perf_counter() - start) / iterations)
+        _results[self._name] = {'min': min(times), 'median': statistics.median(times),
+                                'mean': statistics.mean(times), 'stddev': statistics.stdev(times),
+                                'rounds': _ROUNDS, 'iterations': iterations}
+        return result
+
+
+@pytest.fixture
+def bench(request) -> Bench:
+    """Times code under the name of the test, such as 'test_cards.py::test_deck[HARD]'."""
+    name = request.node.nodeid.split('/')[-1]
+    return Bench(name, request.config.getoption('--bench-time'))
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=_ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return time.strftime('%Y%m%d-%H%M%S')
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _results:
+        return
+    commit = _commit()
+    path = session.config.getoption('--bench-json') or os.path.join(cfg.CACHE_DIR, 'benchmarks', f'{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'commit': commit, 'python': sys.version.split()[0], 'pygame': pg.version.ver,
+                   'platform': platform.platform(), 'benchmarks': _results}, f, indent=1, sort_keys=True)
+    session.config.bench_json_path = path
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    path = getattr(config, 'bench_json_path', None)
+    if path:
+        terminalreporter.write_line(f"benchmark results: {path}")
@@ -0,0 +1,40 @@
+import pytest
+
+import src.config as cfg
+import src.services.image_loader as image_loader
+from src.deck import Deck
+from src.memory_game import MemoryGame
+from src.game_state import GamePlayingState
+
+
+def test_get_image(game, bench):
+    bench(image_loader.get_image, 'cardHeartsA.png')
+
+
+def test_get_image_copy(game, bench):
+    bench(image_loader.get_image, 'cardHeartsA.png', True)
+
+
+def test_deck(bench):
+    bench(Deck)
+
+
+@pytest.mark.parametrize('difficulty', cfg.PAIRS_BY_DIFFICULTY)
+def test_sample_pairs(bench, difficulty):
+    pairs = cfg.PAIRS_BY_DIFFICULTY[difficulty]
+    assert len(bench(lambda: Deck().sample_pairs(pairs))) == 2 * pairs
+
+
+@pytest.mark.parametrize('difficulty', cfg.PAIRS_BY_DIFFICULTY)
+def test_pick_cards(game, bench, difficulty):
+    pairs = cfg.PAIRS_BY_DIFFICULTY[difficulty]
+    assert len(bench(lambda: MemoryGame(Deck(rng=game.rng).sample_pairs(pairs)))) == 2 * pairs
+
+
+@pytest.mark.parametrize('difficulty', cfg.PAIRS_BY_DIFFICULTY)
+def test_enter(game, bench, difficulty):
+    """Dealing, scaling and laying out a new board, as restarting does."""
+    state = GamePlayingState(game, difficulty)
+    game.state = state
+    bench(state.enter)
+    game.state = game.main_menu_state
@@ -0,0 +1,87 @@
+import itertools
+
+import pytest
+import pygame as pg
+
+import src.config as cfg
+import src.services.timer as scheduler
+from src.game_state import GamePlayingState
+
+
+@pytest.fixture(params=list(cfg.PAIRS_BY_DIFFICULTY))
+def playing(game, request) -> GamePlayingState:
+    state = GamePlayingState(game, request.param)
+    game.state = state
+    game.frame()
+    yield state
+    game.state = game.main_menu_state
+
+
+def _clicks(state: GamePlayingState):
+    """Cycles through the centers of one card of each pair, so every second click is a wrong guess and play never ends.
+
+    Each click also flips back the wrong guess before it, as a player clicking quickly would.
+    """
+    board = state.memory_game.board
+    firsts = sorted({card_id: index for index, card_id in reversed(list(enumerate(board)))}.values())
+    return itertools.cycle([state.card_rect(index).center for index in firsts])
+
+
+def _post_click(pos) -> None:
+    """Posts the events of a left click at pos, as the input recorder would replay them."""
+    pg.event.post(pg.event.Event(pg.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+    pg.event.post(pg.event.Event(pg.MOUSEBUTTONDOWN, pos=pos, button=1))
+    pg.event.post(pg.event.Event(pg.MOUSEBUTTONUP, pos=pos, button=1))
+    # A key with no binding, so that key events are processed without pausing the game.
+    pg.event.post(pg.event.Event(pg.KEYDOWN, key=pg.K_a, mod=0))
+    pg.event.post(pg.event.Event(pg.KEYUP, key=pg.K_a, mod=0))
+
+
+def test_draw_full(game, bench, playing):
+    def draw():
+        playing.invalidate()
+        return playing.draw(game.screen)
+    assert bench(draw) is None
+
+
+def test_update(bench, playing):
+    clicks = _clicks(playing)
+
+    def update():
+        _post_click(next(clicks))
+        playing.process_inputs()
+        scheduler.update(0)
+        playing.update()
+        return playing.memory_game.guesses
+    assert bench(update)
+    assert not playing.memory_game.is_won
+
+
+def test_present(game, bench, playing):
+    playing.invalidate()
+    playing.draw(game.screen)
+    bench(pg.display.flip)
+
+
+def test_frame(game, bench, playing):
+    bench(game.frame)
+
+
+def test_frame_flip(game, bench, playing):
+    clicks = _clicks(playing)
+
+    def frame():
+        _post_click(next(clicks))
+        game.frame()
+        return playing.memory_game.guesses
+    assert bench(frame)
+    assert not playing.memory_game.is_won
+
+
+def test_main_menu_draw_full(game, bench):
+    game.state = game.main_menu_state
+
+    def draw():
+        game.main_menu_state.invalidate()
+        return game.main_menu_state.draw(game.screen)
+    bench(draw)
@@ -0,0 +1,45 @@
+import pygame as pg
+
+import src.config as cfg
+from src.services.text import TextRenderer
+import src.ui.menu as menu_module
+from src.ui.menu import Menu
+
+_BUTTONS = [{'action': None, 'text': text, 'size': 16, 'color': cfg.WHITE} for text in ('Restart', 'Main Menu')]
+
+
+def _make_menu(group: pg.sprite.Group) -> Menu:
+    menu = Menu("Guesses: 12", 24, cfg.WHITE, _BUTTONS, group)
+    menu.kill()
+    for button in menu.buttons:
+        button.kill()
+    return menu
+
+
+def test_menu(game, bench):
+    """A menu like one built before, whose panel and button images are cached."""
+    bench(_make_menu, pg.sprite.Group())
+
+
+def test_menu_uncached(game, bench):
+    """A menu built from scratch: resizing the panel and rendering every title and label."""
+    group = pg.sprite.Group()
+
+    def make_menu():
+        menu_module.clear_cache()
+        return _make_menu(group)
+    bench(make_menu)
+
+
+def test_render_text_cached(game, bench):
+    renderer = TextRenderer()
+    surface = pg.Surface((400, 100))
+    bench(renderer.render, surface, "Memory", 24, cfg.WHITE)
+    assert renderer.stats()['misses'] == 1
+
+
+def test_render_text_uncached(game, bench):
+    renderer = TextRenderer()
+    surface = pg.Surface((400, 100))
+    count = iter(range(1 << 30))
+    bench(lambda: renderer.render(surface, f"Guesses: {next(count)}", 24, cfg.WHITE))
@@ -0,0 +1,25 @@
+"""Fixtures shared by the tests and the benchmarks, which run headless under SDL's dummy drivers."""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pytest
+import pygame as pg
+
+import src.config as cfg
+
+
+@pytest.fixture(scope='session')
+def game():
+    """The game with every asset loaded, the frame rate uncapped, and cards dealt from a fixed seed."""
+    from src.game import Game
+    import src.services.preloader as preloader
+    cfg.FPS = 0
+    cfg.IDLE_WAIT = False
+    game = Game(seed=0)
+    preloader.finish()
+    game.start()
+    yield game
+    pg.quit()
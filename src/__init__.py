@@ -1,6 +0,0 @@
-import pygame as pg
-
-import src.config as cfg
-
-pg.init()
-pg.display.set_mode((cfg.SCREEN_WIDTH, cfg.SCREEN_HEIGHT))
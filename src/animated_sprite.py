@@ -2,7 +2,6 @@ import math
 import typing
 import pygame as pg
 
-import src.config as cfg
 import src.services.image_loader as image_loader
 from src.base_sprite import BaseSprite
 
@@ -28,8 +27,6 @@ class AnimatedSprite(BaseSprite):
         # Load all images for this sprite.
         self._images = [self.image]
         self._images.extend([image_loader.get_image(img) for img in images[1:]])
-        for image in self._images:
-            image.set_colorkey(cfg.BLACK)
 
         # Store animation data.
         self._frame_info = frame_info
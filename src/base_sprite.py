@@ -1,7 +1,6 @@
 import pygame as pg
 import abc
 
-import src.config as cfg
 import src.services.image_loader as image_loader
 
 
@@ -15,8 +14,8 @@ class BaseSprite(pg.sprite.Sprite, metaclass=abc.ABCMeta):
         :param groups: A sequence of sprite groups that this sprite will be added to.
         """
         pg.sprite.Sprite.__init__(self, *groups)
+        # Shared with other sprites; its sprite sheet sets the color key.
         self.image = image_loader.get_image(image)
-        self.image.set_colorkey(cfg.BLACK)
         self.all_groups = all_groups
         self.rect = self.image.get_rect()
         self.hit_rect = self.rect  # Untransformed rectangle for collision-handling.
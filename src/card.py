@@ -4,44 +4,69 @@ import pygame as pg
 import src.services.image_loader as image_loader
 
 
-class Card(pg.sprite.Sprite):
-    """Sprite class that models a playing card from a 52-card deck."""
+class Card:
+    """Models a playing card from a 52-card deck by its integer id, without owning any image.
+
+    Face images are shared by every card with the same id; fetch them by image_name from the image loader, scaled to
+    the size needed. Two Card objects with the same id are still distinct cards, such as the two halves of a pair.
+    """
+    __slots__ = ('_id', '_face_up')
+
     TWO, THREE, FOUR, FIVE, SIX, SEVEN, EIGHT, NINE, TEN = '2', '3', '4', '5', '6', '7', '8', '9', '10'
     ACE, JACK, QUEEN, KING = 'A', 'J', 'Q', 'K'
     SPADES, HEARTS, DIAMONDS, CLUBS = "Spades", "Hearts", "Diamonds", "Clubs"
 
     BACK_CARD_IMAGE = 'cardBack_red1.png'
+    # Number of distinct cards; ids range from 0 to DECK_SIZE - 1.
+    DECK_SIZE = 52
+
+    def __init__(self, card_id: int):
+        """Creates a card and defaults to having it face up.
+
+        :param card_id: The card's id, from 0 to 51: its suit's index in Card.suits() times 13, plus its value's index
+                        in Card.values().
+        """
+        if not 0 <= card_id < Card.DECK_SIZE:
+            raise ValueError(f"card id must be from 0 to {Card.DECK_SIZE - 1}, not {card_id}")
+        self._id = card_id
+        self._face_up = True
 
-    def __init__(self, suit, value):
-        """Creates a hard and defaults to having it face up.
+    @classmethod
+    def from_suit_value(cls, suit: str, value: str) -> 'Card':
+        """Creates a card from its suit and value.
 
         :param suit: The card's suit; only valid suits are Card.SPADES, Card.HEARTS, Card.DIAMONDS, and Card.CLUBS.
         :param value: The card's value; only valid ones are Card.TWO,... Card.TEN,
         Card.ACE, Card.JACK, Card.QUEEN, and Card.King.
         """
-        pg.sprite.Sprite.__init__(self)
-        self._suit = suit
-        self._val = value
-        self.image = image_loader.get_image(f"card{suit}{value}.png")
-        self.rect = self.image.get_rect()
-        self._face_up = True
+        return cls(cls.suits().index(suit) * len(cls.values()) + cls.values().index(value))
+
+    @property
+    def id(self) -> int:
+        """Returns this card's id, from 0 to 51."""
+        return self._id
 
     @property
     def suit(self) -> str:
         """Returns this card's suit, which is one of Card.SPADES,...,Card.CLUBS"""
-        return self._suit
+        return self.suits()[self._id // 13]
 
     @property
     def value(self) -> str:
         """Returns this card's value, which is one of Card.TWO,..., Card.TEN, Card.ACE,..., Card.KING"""
-        return self._val
+        return self.values()[self._id % 13]
+
+    @property
+    def image_name(self) -> str:
+        """Returns the name of this card's face image in the sprite sheet."""
+        return Card.image_names()[self._id]
 
     @property
     def is_face_up(self) -> bool:
         return self._face_up
 
     def flip(self) -> None:
-        """Negates the 'is_face_up' property of the card; note the image remains unchanged."""
+        """Negates the 'is_face_up' property of the card."""
         self._face_up = not self._face_up
 
     @classmethod
@@ -53,6 +78,14 @@ class Card(pg.sprite.Sprite):
         return cls.ACE, cls.TWO, cls.THREE, cls.FOUR, cls.FIVE, cls.SIX, \
                cls.SEVEN, cls.EIGHT, cls.NINE, cls.TEN, cls.JACK, cls.QUEEN, cls.KING
 
+    @classmethod
+    def image_names(cls) -> typing.Tuple[str, ...]:
+        """Returns the names of the face images of all 52 cards, indexed by card id."""
+        return _IMAGE_NAMES
+
     @classmethod
     def back_card_image(cls) -> pg.Surface:
         return image_loader.get_image(cls.BACK_CARD_IMAGE)
+
+
+_IMAGE_NAMES = tuple(f"card{suit}{value}.png" for suit in Card.suits() for value in Card.values())
@@ -7,11 +7,62 @@ SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 1024
 TITLE = "Memory"
 FPS = 30
+# Whether states redraw and present only the areas of the screen that changed, instead of flipping every frame.
+DIRTY_RECTS = True
+# Whether the game loop sleeps until the next input or timer while nothing on screen is changing.
+IDLE_WAIT = True
+# Longest the game loop sleeps at once while idle, in milliseconds.
+IDLE_MAX_WAIT = 1000
+# Whether the time spent in each phase of every frame is recorded from the start. F3 shows frame time percentiles and
+# starts recording; F12, or SIGUSR1 where available, writes the recorded frames to TRACE_DIR as a Chrome trace. Enable
+# this on machines whose hitches are reported after the fact, since no trace is written while nothing was recorded.
+PROFILER = False
+# Whether the input events of every session are recorded to RECORDING_DIR, to be replayed with
+# 'python -m src.input.recording'.
+RECORD_INPUT = False
+# Number of most recent frames the profiler keeps.
+PROFILER_FRAMES = 600
+# Seconds between refreshes of the profiler's on-screen percentiles.
+PROFILER_HUD_INTERVAL = 0.5
 
 # Game directory and game assets directories.
 GAME_DIR = os.path.dirname(__file__)
-IMG_DIR = os.path.join(GAME_DIR, 'assets', 'images')
-SND_DIR = os.path.join(GAME_DIR, 'assets', 'sound')
+ASSETS_DIR = os.path.join(GAME_DIR, 'assets')
+IMG_DIR = os.path.join(ASSETS_DIR, 'images')
+SND_DIR = os.path.join(ASSETS_DIR, 'sound')
+# Where assets are read from: FILES reads the assets directory, PACK reads a single memory-mapped asset pack built
+# with 'python -m src.services.assets'.
+FILES = "FILES"
+PACK = "PACK"
+ASSET_BACKEND = FILES
+# Build outputs that ship with the game.
+BUILD_DIR = os.path.join(os.path.dirname(GAME_DIR), 'build')
+ASSET_PACK = os.path.join(BUILD_DIR, 'assets.pack')
+# Files derived from the game and its environment, which are safe to delete.
+CACHE_DIR = os.path.join(os.path.dirname(GAME_DIR), '.cache')
+FONT_CACHE_FILE = os.path.join(CACHE_DIR, 'fonts.json')
+ATLAS_DIR = os.path.join(CACHE_DIR, 'atlas')
+# Chrome trace files written by the frame profiler.
+TRACE_DIR = os.path.join(os.path.dirname(GAME_DIR), 'traces')
+# Input logs written when RECORD_INPUT is set.
+RECORDING_DIR = os.path.join(os.path.dirname(GAME_DIR), 'recordings')
+
+# Whether assets load on worker threads behind a loading screen, rather than before the window shows anything.
+PRELOAD_ASSETS = True
+PRELOAD_WORKERS = 2
+# Seconds per frame the game loop spends storing assets that finished loading, such as converting sprite sheets.
+PRELOAD_FRAME_BUDGET = 0.005
+
+# Categories of sound effects, and the number of mixer channels reserved for each, highest priority first. A sound
+# effect whose channels are all busy takes a free channel of a lower priority category, or else cuts off the oldest.
+SFX_JINGLE = "JINGLE"
+SFX_FLIP = "FLIP"
+SFX_UI = "UI"
+SFX_CHANNELS = {SFX_JINGLE: 1, SFX_FLIP: 2, SFX_UI: 1}
+# Bytes of decoded samples kept in memory; the least recently played sound effects are decoded again when needed.
+SFX_MEMORY_BUDGET = 4 * 1024 * 1024
+# Sound effects decoded while loading, rather than on first use.
+PRELOAD_SFX = ('shuffle.wav', 'contact1.wav')
 
 # Color RGBs
 BLACK = (0, 0, 0)
@@ -24,19 +75,33 @@ TRANSPARENT = (255, 255, 255, 0)
 COLOR_KEY = BLACK
 
 
-# Sprite sheets.
+# Sprite sheets; a sheet with a 'colorkey' has that color made transparent in all of its images.
 SPRITE_SHEETS = (
     {"img": "playingCards.png", "xml": "playingCards.xml"},  # Game Object images.
     {"img": "playingCardBacks.png", "xml": "playingCardBacks.xml"},
-    {"img": "blueSheet.png", "xml": "blueSheet.xml"}
+    {"img": "blueSheet.png", "xml": "blueSheet.xml", "colorkey": COLOR_KEY}  # UI images.
 )
 CARD_HEIGHT = 140
 CARD_WIDTH = 190
+# Maximum number of scaled images kept by the image loader (52 faces and a back for each difficulty fit).
+SCALED_IMAGE_CACHE_SIZE = 256
+# Whether sprite sheets are loaded from compiled atlas files, which are rebuilt whenever their sources change.
+ATLAS_CACHE = True
+# Whether atlas files also store raw pixels, trading disk space and reads for skipping PNG decoding.
+ATLAS_CACHE_PIXELS = True
+# Whether to scale every card for every difficulty in the background when the game starts.
+PRESCALE_CARDS = True
 
 # Game font names.
 FONT_NAMES = ('arial', 'calibri')
+# Maximum number of rendered text surfaces kept by the text renderer.
+TEXT_CACHE_SIZE = 128
+# Maximum number of menu panels, and of sets of button images, kept with their text rendered for reuse.
+MENU_CACHE_SIZE = 32
 EASY = "EASY"
 MEDIUM = "MEDIUM"
 HARD = "HARD"
 # Difficulty -> Number of Pairs (note that, when doubled, you get a perfect square).
 PAIRS_BY_DIFFICULTY = {EASY: 8, MEDIUM: 18, HARD: 32}
+# Seconds that a wrong guess stays face up before both cards flip back down.
+MISMATCH_REVEAL_TIME = 1.5
@@ -1,31 +1,66 @@
+import array
 import typing
 import random
-import pygame as pg
 
-import src.services.image_loader as image_loader
 from src.card import Card
 
 
-class Deck(pg.sprite.Sprite):
-    """Sprite that represents a 52-card deck."""
-    def __init__(self):
-        """Creates a Deck of 52 cards and shuffles them."""
-        pg.sprite.Sprite.__init__(self)
-        self._cards = [Card(suit, value) for suit in Card.suits() for value in Card.values()]
-        self.image = image_loader.get_image('cardBack_red1.png')
-        self.rect = self.image.get_rect()
-        self.shuffle()
+class Deck:
+    """One or more 52-card decks, stored as a compact array of card ids."""
+    def __init__(self, decks: int = 1, rng: typing.Optional[random.Random] = None):
+        """Creates a deck of 'decks' times 52 card ids. No Card objects or images are created until cards are drawn.
+
+        The deck is shuffled lazily: each draw picks its cards at random from those left, so the cost of drawing
+        depends on the number of cards drawn rather than on the size of the deck.
+
+        :param decks: Number of 52-card decks to combine; each card id appears this many times.
+        :param rng: Random number generator to draw with, such as random.Random(seed) for a repeatable deal;
+                    defaults to the random module's shared generator.
+        """
+        if decks < 1:
+            raise ValueError(f"decks must be at least 1, not {decks}")
+        self._ids = array.array('B', range(Card.DECK_SIZE)) * decks
+        self._rng = rng if rng is not None else random
+
+    def __len__(self) -> int:
+        return len(self._ids)
 
     def shuffle(self) -> None:
-        """Shuffles the deck of cards."""
-        random.shuffle(self._cards)
+        """Shuffles the cards left in the deck."""
+        self._rng.shuffle(self._ids)
+
+    def draw(self, k: int = 1) -> array.array:
+        """ Removes k cards chosen at random from the deck.
+
+        :param k: Number of cards to draw.
+        :return: Array of the ids of the cards drawn.
+        """
+        ids = self._ids
+        n = len(ids)
+        if not 0 <= k <= n:
+            raise ValueError(f"cannot draw {k} cards from a deck of {n}")
+        # Partial Fisher-Yates shuffle: move a random card to the end of the deck k times, then cut those k off.
+        for last in range(n - 1, n - 1 - k, -1):
+            j = self._rng.randrange(last + 1)
+            ids[j], ids[last] = ids[last], ids[j]
+        drawn = ids[n - k:]
+        del ids[n - k:]
+        return drawn
+
+    def sample_pairs(self, k: int) -> array.array:
+        """ Draws k cards and deals a shuffled memory game board with two of each.
+
+        With more than one deck, the same card id may be drawn more than once, and then appears four or more times.
+
+        :param k: Number of pairs.
+        :return: Array of 2k card ids, in board order.
+        """
+        board = self.draw(k) * 2
+        self._rng.shuffle(board)
+        return board
 
     def discard(self) -> typing.Union['Card', None]:
         """Returns a card if the deck is not empty; otherwise, returns None"""
-        if self._cards:
-            card = self._cards.pop()
-            card.rect.topleft = self.rect.topright
-            if len(self._cards) == 0:
-                self.kill()
-            return card
+        if self._ids:
+            return Card(self.draw()[0])
         return None  # None is returned by default... but just being explicit.
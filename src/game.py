@@ -1,23 +1,56 @@
+import math
+import time
+import random
+import typing
 import pygame as pg
 
 import src.config as cfg
-import src.services.image_loader
-import src.services.sound
+import src.services.image_loader as image_loader
+import src.services.sound as sound_manager
+import src.services.timer as scheduler
+import src.services.preloader as preloader
+import src.services.profiler as profiler
+import src.input.input_state as input_state
+import src.input.input_manager as input_manager
+import src.input.recording as recording
+from src.input.input_state import InputState
 from src.ui.ui import UI
-from src.game_state import GameState, GameMainMenuState
+from src.game_state import GameState, GameLoadingState, GameMainMenuState, GamePlayingState
 
 
 class Game:
     """Top-level game class for running the current pygame application."""
-    def __init__(self):
-        """Sets the game screen and clock."""
-        self._screen = pg.display.get_surface()
+    def __init__(self, seed: typing.Optional[int] = None):
+        """Opens the game window, loads the game's images and sounds, and sets the clock.
+
+        :param seed: Seed to deal cards with, such as that of a recorded session; random by default.
+        """
+        pg.init()
+        self._screen = pg.display.set_mode((cfg.SCREEN_WIDTH, cfg.SCREEN_HEIGHT))
+        if cfg.PRELOAD_ASSETS:
+            image_loader.preload(first=GameMainMenuState.ASSETS)
+            sound_manager.preload()
+        else:
+            image_loader.init()
+            sound_manager.init()
         self._clock = pg.time.Clock()
         self._ui = UI()
         self._running = False
+        # Frames per second last shown in the window caption, which is only set again when it changes.
+        self._caption_fps = None
+        self._profiler = profiler.get_profiler()
+        self._profiler.install_signal_handler()
+        # Cards are dealt from a generator of the game's own, so that a recorded session can be dealt again.
+        seed = seed if seed is not None else random.randrange(1 << 64)
+        self._rng = random.Random(seed)
+        if cfg.RECORD_INPUT:
+            input_manager.set_session(recording.Recorder(recording.new_path(), seed))
 
+        self._loading_state = GameLoadingState(self)
         self._main_menu_state = GameMainMenuState(self)
         self._state = None
+        if cfg.PRESCALE_CARDS:
+            preloader.when_done(GamePlayingState.prescale_cards)
 
     @property
     def ui(self) -> UI:
@@ -27,6 +60,11 @@ class Game:
     def screen(self) -> pg.Surface:
         return self._screen
 
+    @property
+    def rng(self) -> random.Random:
+        """Returns the random number generator that cards are dealt with."""
+        return self._rng
+
     @property
     def main_menu_state(self) -> GameMainMenuState:
         return self._main_menu_state
@@ -50,12 +88,83 @@ class Game:
 
     def run(self) -> None:
         """Runs the game loop: processes inputs, updates, and draws at a frame rate specified in a config file."""
-        self._running = True
-        self.state = self._main_menu_state
+        self.start()
         while self._running:
-            dt = self._clock.tick(cfg.FPS) / 1000
-            self._state.process_inputs()
-            self._state.update()
-            self._state.draw(self._screen)
-            pg.display.set_caption(f"{cfg.TITLE}: {int(self._clock.get_fps())} (FPS)")
-            pg.display.flip()
\ No newline at end of file
+            self.frame()
+
+    def start(self) -> None:
+        """Enters the first state, which shows loading progress until the main menu is ready."""
+        self._running = True
+        self.state = self._loading_state
+
+    def frame(self) -> None:
+        """Runs a single iteration of the game loop, presenting only the areas of the screen the state redrew.
+
+        While the profiler is enabled, the start of each phase is recorded; otherwise, each phase costs one check.
+        """
+        preloader.poll(cfg.PRELOAD_FRAME_BUDGET)
+        if cfg.IDLE_WAIT and preloader.is_done() and self._state.is_idle():
+            self._wait_for_event()
+        dt = self._clock.tick(cfg.FPS) / 1000
+        # Recorded sessions start once loading is over, since how many frames it takes varies.
+        if self._state is not self._loading_state:
+            dt = input_manager.begin_frame(dt)
+        profiling = self._profiler.enabled
+        if profiling:
+            inputs_start = time.perf_counter_ns()
+        self._state.process_inputs()
+        self._handle_profiler_keys()
+        scheduler.update(dt)
+        if profiling:
+            update_start = time.perf_counter_ns()
+        self._state.update()
+        if profiling:
+            draw_start = time.perf_counter_ns()
+        rects = self._state.draw(self._screen)
+        if self._profiler.hud_visible and rects is not None:
+            rects.append(self._profiler.draw_hud(self._screen))
+        elif self._profiler.hud_visible:
+            self._profiler.draw_hud(self._screen)
+        if profiling:
+            flip_start = time.perf_counter_ns()
+        if rects is None:
+            pg.display.flip()
+        elif rects:
+            pg.display.update(rects)
+        if profiling:
+            self._profiler.record(inputs_start, update_start, draw_start, flip_start, time.perf_counter_ns())
+        self._profiler.end_frame()
+        self._update_caption()
+
+    def _update_caption(self) -> None:
+        """Shows the frame rate in the window caption, which pygame only recomputes every few frames anyway."""
+        fps = f"{self._clock.get_fps():.0f}"
+        if fps != self._caption_fps:
+            self._caption_fps = fps
+            pg.display.set_caption(f"{cfg.TITLE}: {fps} (FPS)")
+
+    def _handle_profiler_keys(self) -> None:
+        """Toggles the profiler's on-screen percentiles with F3, and writes a trace with F12."""
+        if input_state.get_key_state(pg.K_F3) == InputState.JUST_RELEASED:
+            self._profiler.toggle_hud()
+            if not self._profiler.hud_visible:
+                # Repaint what the percentiles covered.
+                self._state.invalidate()
+        if input_state.get_key_state(pg.K_F12) == InputState.JUST_RELEASED:
+            self._profiler.request_dump()
+
+    def _wait_for_event(self) -> None:
+        """Sleeps until an event arrives or the next scheduled timer is due, whichever comes first."""
+        timeout = cfg.IDLE_MAX_WAIT
+        due = scheduler.next_due()
+        if due is not None:
+            if due <= 0:
+                return
+            timeout = min(timeout, math.ceil(due * 1000))
+        event = pg.event.wait(timeout)
+        if event.type == pg.NOEVENT:
+            return
+        if event.type == pg.VIDEOEXPOSE:
+            self._state.invalidate()
+        # Hand the event to the state this frame, ahead of any that arrived after it.
+        input_manager.put_back(event)
@@ -6,19 +6,23 @@ Medieval loop sound from: https://opengameart.org/content/short-medieval-loop
 """
 import abc
 import sys
-import time
-import random
+import typing
 import math
 import pygame as pg
 
 import src.config as cfg
 import src.input.input_manager as input_manager
+import src.input.input_state as input_state
 import src.services.image_loader as image_loader
+import src.services.preloader as preloader
+import src.services.text as text_renderer
 import src.services.sound as sound_manager
-import src.utils.helpers as helpers
+import src.services.timer as scheduler
 from src.input.input_state import InputState
 from src.deck import Deck
+from src.memory_game import MemoryGame
 from src.card import Card
+from src.utils.layout import GridLayout
 
 
 class GameState(metaclass=abc.ABCMeta):
@@ -29,6 +33,19 @@ class GameState(metaclass=abc.ABCMeta):
         :param game: Game class whose behavior is driven by this class.
         """
         self._game = game
+        # Whether the whole screen must be redrawn next frame, rather than only what changed.
+        self._redraw = True
+
+    def invalidate(self) -> None:
+        """Forces the whole screen to be redrawn next frame, such as after the window is exposed."""
+        self._redraw = True
+
+    def is_idle(self) -> bool:
+        """Whether nothing will change on screen until an input arrives or a scheduled timer is due.
+
+        The game loop sleeps until then instead of running frames while the state is idle.
+        """
+        return not self._redraw and not self._game.ui.changed and not input_state.any_mouse_pressed()
 
     @abc.abstractmethod
     def enter(self) -> None:
@@ -49,19 +66,72 @@ class GameState(metaclass=abc.ABCMeta):
         pass
 
     @abc.abstractmethod
-    def draw(self, screen: pg.Surface) -> None:
+    def draw(self, screen: pg.Surface) -> typing.Optional[typing.List[pg.Rect]]:
+        """Draws the state onto the screen.
+
+        :param screen: The display surface.
+        :return: The areas of the screen that were redrawn, or None if the whole screen should be presented.
+        """
         pass
 
 
+class GameLoadingState(GameState):
+    """Shows loading progress until the main menu's assets are ready, while the rest keep loading behind it."""
+    _BAR_WIDTH, _BAR_HEIGHT, _BAR_PADDING = 400, 24, 4
+
+    def enter(self):
+        """Draws the loading screen from scratch."""
+        self._redraw = True
+
+    def process_inputs(self):
+        """Allows the player to quit while loading."""
+        events = input_manager.get_events()
+        for event in events:
+            if event.type == pg.QUIT:
+                sys.exit()
+        input_manager.update_inputs(events)
+
+    def is_idle(self) -> bool:
+        """Never idle, so that progress keeps being drawn."""
+        return False
+
+    def update(self) -> None:
+        """Moves on to the main menu once its assets have loaded."""
+        if preloader.is_done() or preloader.is_ready(*GameMainMenuState.ASSETS):
+            self._game.state = self._game.main_menu_state
+
+    def draw(self, screen: pg.Surface) -> typing.Optional[typing.List[pg.Rect]]:
+        """Draws a progress bar of the assets loaded so far."""
+        screen.fill(cfg.BLACK)
+        bar = pg.Rect(0, 0, GameLoadingState._BAR_WIDTH, GameLoadingState._BAR_HEIGHT)
+        bar.center = (cfg.SCREEN_WIDTH / 2, cfg.SCREEN_HEIGHT / 2)
+        pg.draw.rect(screen, cfg.WHITE, bar, 2)
+        fill = bar.inflate(-2 * GameLoadingState._BAR_PADDING, -2 * GameLoadingState._BAR_PADDING)
+        fill.width = int(fill.width * preloader.progress())
+        pg.draw.rect(screen, cfg.WHITE, fill)
+        text_renderer.render_pos(screen, x=bar.centerx, y=bar.top - 2 * bar.h, text="Loading...", size=24,
+                                 color=cfg.WHITE)
+        return None
+
+
 class GameMainMenuState(GameState):
     """Represents the menu that a player sees upon opening the game."""
+    # Assets the main menu needs, which are loaded before any others.
+    ASSETS = ('images/png/main-menu-splash.png', 'images/spritesheets/blueSheet.png')
+
     def __init__(self, game):
-        """Creates the main menu splash."""
+        """Creates the main menu state; the splash is fetched on entering, once the images have loaded."""
         GameState.__init__(self, game)
-        self._main_menu_splash = image_loader.get_image('main-menu-splash.png')
+        self._main_menu_splash = None
 
     def enter(self):
         """Creates the menu that lets a player begin playing or exit."""
+        self._redraw = True
+        if self._main_menu_splash is None:
+            # Entered directly rather than from the loading state, so wait for loading to finish.
+            if not preloader.is_ready(*GameMainMenuState.ASSETS):
+                preloader.finish()
+            self._main_menu_splash = image_loader.get_image('main-menu-splash.png')
         self._game.ui.clear()
         buttons = [
             {'action': self._select_difficulty, 'text': "Play", 'size': 16, 'color': cfg.WHITE},
@@ -71,20 +141,25 @@ class GameMainMenuState(GameState):
 
     def process_inputs(self):
         """Saves all inputs and allows the UI to process them."""
-        for event in pg.event.get():
+        events = input_manager.get_events()
+        for event in events:
             if event.type == pg.QUIT:
                 sys.exit()
-        input_manager.update_inputs()
+        input_manager.update_inputs(events)
         self._game.ui.process_inputs()
 
     def update(self) -> None:
         """Does nothing."""
         pass
 
-    def draw(self, screen: pg.Surface) -> None:
-        """Draws the main menu splash and the UI."""
+    def draw(self, screen: pg.Surface) -> typing.Optional[typing.List[pg.Rect]]:
+        """Draws the main menu splash and the UI, or only the buttons that changed when drawing dirty rects."""
+        if cfg.DIRTY_RECTS and not self._redraw and not self._game.ui.changed:
+            return self._game.ui.draw_dirty(screen)
         screen.blit(self._main_menu_splash, self._main_menu_splash.get_rect())
         self._game.ui.draw(screen)
+        self._redraw = False
+        return None
 
     def _select_difficulty(self):
         """Creates a menu that allows a player to select the game's difficulty."""
@@ -118,140 +193,194 @@ class GamePlayingState(GameState):
         """
         GameState.__init__(self, game)
         self._difficulty = difficulty
-        self._all_cards = []
-        self._guessed_pairs = []
-        self._flipped_card = None
+        # Rules and state of the game being played; the cards on the board hold card ids.
+        self._memory_game = None
+        # Screen rectangle and shared face image of each card, by board index.
+        self._card_rects = []
+        self._card_faces = []
         self._paused = False
         self._back_card_image = None
-        self._guesses = 0
+        # Maps a mouse position to the index of the card under it.
+        self._layout = None
+        # Pending timer that flips a wrong guess back down.
+        self._hide_timer = None
+        # Board indices of the cards that were flipped since the last frame was drawn.
+        self._dirty_cards = []
+
+    @property
+    def memory_game(self) -> MemoryGame:
+        """Returns the rules and state of the game being played."""
+        return self._memory_game
+
+    @property
+    def paused(self) -> bool:
+        """Whether play is suspended behind the pause or game over menu."""
+        return self._paused
+
+    def card_rect(self, index: int) -> pg.Rect:
+        """Returns the area of the screen the card at the given board index is drawn in."""
+        return self._card_rects[index]
 
     def enter(self):
         """Creates the pairs the player must guess in order to win."""
+        # The playing cards and sounds may still be loading in the background.
+        preloader.finish()
         self._game.ui.clear()
+        self._cancel_hide_timer()
         self._pick_cards()
         self._scale_cards()
         self._paused = False
-        self._guesses = 0
-        sound_manager.play_sfx('shuffle.wav')
+        self._dirty_cards = []
+        self._redraw = True
+        sound_manager.play_sfx('shuffle.wav', cfg.SFX_FLIP)
         sound_manager.play_music('medieval_loop.ogg', loops=-1)
 
     def exit(self):
         """Stops the main gameplay music."""
+        self._cancel_hide_timer()
         sound_manager.stop_music()
 
+    def _cancel_hide_timer(self) -> None:
+        """Cancels flipping back a wrong guess, such as when its cards are about to be discarded."""
+        if self._hide_timer:
+            self._hide_timer.cancel()
+            self._hide_timer = None
+
     def process_inputs(self) -> None:
         """Allows the player to quit or pause the game, and the UI to process inputs directed at it."""
-        for event in pg.event.get():
+        events = input_manager.get_events()
+        for event in events:
             if event.type == pg.QUIT:
                 sys.exit()
             # todo: event for pausing and returning to main menu.
             if event.type == pg.KEYUP:
                 if event.key == pg.K_p:
                     self._pause()
-        input_manager.update_inputs()
+        input_manager.update_inputs(events)
         self._game.ui.process_inputs()
 
+    def is_idle(self) -> bool:
+        """Whether nothing will change on screen until an input arrives or the wrong guess timer is due."""
+        return GameState.is_idle(self) and not self._dirty_cards
+
     def update(self):
         # See if game is over.
-        if not self._paused and len(self._guessed_pairs) == len(self._all_cards):
+        if not self._paused and self._memory_game.is_won:
             sound_manager.stop_music()
-            sound_manager.play_sfx('Won!.wav')
+            sound_manager.play_sfx('Won!.wav', cfg.SFX_JINGLE)
             buttons = [
                 {'action': self.enter, 'text': 'Restart', 'size': 16, 'color': cfg.WHITE},
                 {'action': self._main_menu, 'text': 'Main Menu', 'size': 16, 'color': cfg.WHITE}
             ]
-            self._game.ui.make_menu(f"Guesses: {self._guesses}", 24, cfg.WHITE, buttons)
+            self._game.ui.make_menu(f"Guesses: {self._memory_game.guesses}", 24, cfg.WHITE, buttons)
             self._paused = True
         # Do not update if game is paused or mouse click has been processed elsewhere (such as by the UI).
         mouse_state = input_manager.mouse_state.get(InputState.MOUSE_LEFT)
         if self._paused or not mouse_state:
             return
-        for card in self._all_cards:
-            if helpers.is_hovering(card, *pg.mouse.get_pos()) and mouse_state == InputState.JUST_RELEASED:
-                # If card has already been guessed, ignore.
-                if card in self._guessed_pairs or card == self._flipped_card:
-                    break
-                card.flip()
-                sound_manager.play_sfx('contact1.wav')
-                # First card flipped.
-                if self._flipped_card is None:
-                    self._flipped_card = card
-                # A match was found.
-                elif self._flipped_card.value == card.value and self._flipped_card.suit == card.suit:
-                    self._guessed_pairs.append(self._flipped_card)
-                    self._guessed_pairs.append(card)
-                    self._flipped_card = None
-                    self._guesses += 1
-                # Second card was not a match.
-                else:
-                    # Show the card we just flipped for 2 seconds.
-                    self._game.screen.blit(card.image, card.rect)
-                    pg.display.flip()
-                    time.sleep(1.5)
-                    # Flip both cards back down.
-                    self._flipped_card.flip()
-                    card.flip()
-                    self._flipped_card = None
-                    self._guesses += 1
-                break
-
-    def draw(self, screen: pg.Surface) -> None:
-        """Draws all cards and the UI."""
+        index = self._layout.index_at(*input_state.get_mouse_pos())
+        if index is not None and mouse_state == InputState.JUST_RELEASED:
+            # Clicking while a mismatch is being shown flips it back down right away.
+            if self._hide_timer and self._hide_timer.active:
+                self._hide_timer.fire()
+            outcome = self._memory_game.flip(index)
+            # If card is already face up, ignore.
+            if outcome == MemoryGame.IGNORED:
+                return
+            self._dirty_cards.append(index)
+            sound_manager.play_sfx('contact1.wav', cfg.SFX_FLIP)
+            if outcome == MemoryGame.MISMATCH:
+                # Show both cards for a moment, then flip them back down without blocking the game loop.
+                self._hide_timer = scheduler.schedule(cfg.MISMATCH_REVEAL_TIME, self._hide_mismatch)
+
+    def _hide_mismatch(self) -> None:
+        """Flips the cards of a wrong guess back down."""
+        self._dirty_cards.extend(self._memory_game.hide_mismatch())
+        self._hide_timer = None
+
+    def draw(self, screen: pg.Surface) -> typing.Optional[typing.List[pg.Rect]]:
+        """Draws all cards and the UI, or only the cards and buttons that changed when drawing dirty rects.
+
+        Cards that changed under a menu are drawn with everything else, so that the menu stays on top of them.
+        """
+        rects = [self._card_rects[index] for index in self._dirty_cards]
+        if cfg.DIRTY_RECTS and not self._redraw and not self._game.ui.changed and not self._game.ui.covers(rects):
+            for index in self._dirty_cards:
+                self._draw_card(screen, index)
+            self._dirty_cards.clear()
+            rects.extend(self._game.ui.draw_dirty(screen))
+            return rects
         # Draw everything.
-        if not self._paused:
-            screen.fill(cfg.WHITE)
-            for card in self._all_cards:
-                if card.is_face_up:
-                    screen.blit(self._back_card_image, card.rect)
-                else:
-                    screen.blit(card.image, card.rect)
+        screen.fill(cfg.WHITE)
+        for index in range(len(self._memory_game)):
+            self._draw_card(screen, index)
         self._game.ui.draw(screen)
+        self._dirty_cards.clear()
+        self._redraw = False
+        return None
+
+    def _draw_card(self, screen: pg.Surface, index: int) -> None:
+        """Draws the back or face of the card at the given board index, depending on which side it is showing."""
+        if self._memory_game.is_revealed(index):
+            screen.blit(self._card_faces[index], self._card_rects[index])
+        else:
+            screen.blit(self._back_card_image, self._card_rects[index])
 
     def _pick_cards(self):
         """Picks a set cards from a deck to determine the pairs the player must guess to win."""
-        self._all_cards = []
-        self._guessed_pairs = []
-        self._flipped_card = None
-        deck = Deck()
         pairs_count = cfg.PAIRS_BY_DIFFICULTY[self._difficulty]
-        # Select pairs
-        for i in range(pairs_count):
-            # Choose a card.
-            card = deck.discard()
-            # Copy each card for the memory game.
-            self._all_cards.append(card)
-            self._all_cards.append(Card(card.suit, card.value))
-
-        # Shuffle all cards.
-        random.shuffle(self._all_cards)
+        self._memory_game = MemoryGame(Deck(rng=self._game.rng).sample_pairs(pairs_count))
 
     def _scale_cards(self):
         """Resizes the cards based on the number of cards chosen to allow an equal number of rows and columns."""
-        # Scale card images.
-        row_cards_count = math.sqrt(len(self._all_cards))
+        cards_count = len(self._memory_game)
+        row_cards_count = math.sqrt(cards_count)
+        card_width, card_height = GamePlayingState.card_size(cards_count)
+
+        # Scaled images come from the image loader's cache, so restarting at the same difficulty does not rescale.
+        # TODO: scaling the Card class back card image directly? doesn't seem right.
+        self._back_card_image = image_loader.get_scaled_image(Card.BACK_CARD_IMAGE, (card_width, card_height))
+
+        row_padding = int((cfg.SCREEN_WIDTH - row_cards_count * card_width) / 2)
+        self._layout = GridLayout(row_padding, 0, card_width, card_height, int(row_cards_count), cards_count)
+        # Cards with the same id share one scaled face image.
+        self._card_faces = [image_loader.get_scaled_image(Card.image_names()[card_id], (card_width, card_height))
+                            for card_id in self._memory_game.board]
+        self._card_rects = [self._layout.cell_rect(i) for i in range(cards_count)]
+
+    @staticmethod
+    def card_size(cards_count: int) -> typing.Tuple[int, int]:
+        """Returns the width and height of each card when 'cards_count' cards are laid out in a square grid.
+
+        :param cards_count: Total number of cards on the board; a perfect square.
+        :return: Width and height of a card.
+        """
+        row_cards_count = math.sqrt(cards_count)
         # Scale vertically so that cards are against screen boundaries.
         card_height = int(cfg.SCREEN_HEIGHT // row_cards_count)
         # Scale horizontally by the same by maintaining aspect ratio.
-        card_width = int(self._all_cards[0].rect.width * (card_height / self._all_cards[0].rect.height))
+        width, height = Card.back_card_image().get_size()
+        card_width = int(width * (card_height / height))
+        return card_width, card_height
 
-        # Scale the back card image.
-        # TODO: scaling the Card class back card image directly? doesn't seem right.
-        self._back_card_image = pg.transform.scale(Card.back_card_image(), (card_width, card_height))
-
-        row_padding = (cfg.SCREEN_WIDTH - row_cards_count * card_width) / 2
-        # Scale the cards picked from the deck.
-        for i, card in enumerate(self._all_cards):
-            card.image = pg.transform.scale(card.image, (card_width, card_height))
-            card.rect = card.image.get_rect()
-            row = int(i / row_cards_count)
-            col = int(i % row_cards_count)
-            card.rect.topleft = (row_padding + col * card_width, row * card_height)
+    @staticmethod
+    def prescale_cards():
+        """Scales every card face and the back card image for every difficulty in a background thread."""
+        sizes = [GamePlayingState.card_size(2 * pairs) for pairs in cfg.PAIRS_BY_DIFFICULTY.values()]
+        image_loader.prescale(Card.image_names() + (Card.BACK_CARD_IMAGE,), sizes)
 
     def _pause(self):
-        """Pauses the game, giving a player options such as restarting, exiting, or continuing to play."""
+        """Pauses the game, giving a player options such as restarting, exiting, or continuing to play.
+
+        A wrong guess being shown stays face up while paused, and flips back down once play resumes.
+        """
         if self._paused:
             self._game.ui.pop_menu()
+            if self._hide_timer:
+                self._hide_timer.resume()
         else:
+            if self._hide_timer:
+                self._hide_timer.pause()
             buttons = [
                 {'action': self._pause, 'text': 'Resume', 'size': 16, 'color': cfg.WHITE},
                 {'action': self.enter, 'text': 'Restart', 'size': 16, 'color': cfg.WHITE},
@@ -1,5 +1,6 @@
 import os
 import json
+import typing
 import pygame as pg
 
 import src.input.input_state as input_state
@@ -12,11 +13,17 @@ class InputManager:
     Sanjay Madhav.
     """
     def __init__(self):
-        """Reads in key bindings from JSON file."""
-        self._key_bindings = {}
+        """Creates the manager; the key bindings are read from a JSON file on the first update, unless loaded first."""
+        self._key_bindings = None
+        # Maps each keycode to the (action, binding) pairs that use it.
+        self._bindings_by_keycode = {}
         self._active_bindings = {}
         self._mouse_state = {}
-        self.load_bindings()
+        # Recorder or Replayer of the input events of each frame, once its first frame has begun; see recording.py.
+        self._session = None
+        self._session_started = False
+        # Events taken off the queue early, such as the one that woke the idle game loop, to be fetched first.
+        self._put_back = []
 
     @property
     def active_bindings(self):
@@ -37,35 +44,89 @@ class InputManager:
             self._key_bindings = json.load(f)
 
         # Convert keycodes to ASCII codes (pygame enums).
-        for bindings in self._key_bindings.values():
+        self._bindings_by_keycode = {}
+        for action, bindings in self._key_bindings.items():
             for binding in bindings:
                 binding['keycode'] = ord(binding['keycode'])
+                self._bindings_by_keycode.setdefault(binding['keycode'], []).append((action, binding))
+
+    def set_session(self, session) -> None:
+        """Records the input events of each frame to a log, or replays them from one, starting with the next frame.
+
+        :param session: Recorder, Replayer, or None to go back to live input only.
+        :return: None
+        """
+        self._session = session
+        self._session_started = False
+
+    def begin_frame(self, dt: float) -> float:
+        """Marks the start of a frame of the recording or replay session, if any.
+
+        :param dt: Seconds since the previous frame, as measured by the game clock.
+        :return: The seconds to advance game time by: dt, unless replaying, in which case the recorded value.
+        """
+        if self._session is None:
+            return dt
+        self._session_started = True
+        return self._session.begin_frame(dt)
+
+    def put_back(self, event: pg.event.Event) -> None:
+        """Returns an event taken off the queue, to be fetched ahead of the events still in the queue.
+
+        Posting it again would put it behind those, so a button press could be seen after its own release.
+        """
+        self._put_back.append(event)
+
+    def get_events(self) -> typing.List[pg.event.Event]:
+        """Fetches the events in the queue since last frame; while replaying, returns the recorded ones instead.
+
+        :return: The events for states to process this frame, in the order they arrived.
+        """
+        events = pg.event.get()
+        if self._put_back:
+            events = self._put_back + events
+            self._put_back = []
+        if self._session is None or not self._session_started:
+            return events
+        return self._session.events(events)
+
+    def update_inputs(self, events: typing.Iterable[pg.event.Event]):
+        """Updates the input state since the last update, and stores any active key bindings.
+
+        :param events: Events fetched from the event queue this frame.
+        :return: None
+        """
+        if self._key_bindings is None:
+            self.load_bindings()
 
-    def update_inputs(self):
-        """Updates the input state since the last update, and stores any active key bindings."""
         # Update key and mouse state.
-        input_state.update()
+        input_state.update(events)
 
         # Clear bindings from last frame.
         self._mouse_state.clear()
         self._active_bindings.clear()
 
-        # Store active key bindings.
-        for button in pg.mouse.get_pressed(num_buttons=3):
+        # Store the state of mouse buttons that are held or changed, so released buttons are absent.
+        for button in input_state.changed_mouse_buttons():
             self._mouse_state[button] = input_state.get_mouse_state(button)
 
-        for action, bindings in self._key_bindings.items():
+        # Only keys that are held or changed can activate a binding.
+        for keycode in input_state.changed_keys():
             # Each action may have multiple bindings, i.e move with 'w' or 'up arrow'.
-            for binding in bindings:
-                if input_state.get_key_state(binding['keycode']) == binding['state_type']:
+            for action, binding in self._bindings_by_keycode.get(keycode, ()):
+                if input_state.get_key_state(keycode) == binding['state_type']:
                     active_action_bindings = self._active_bindings.setdefault(action, [])
                     active_action_bindings.append(binding)
 
 
-# Global object for input handling; loads the key bindings on-import.
+# Global object for input handling; loads the key bindings on first update.
 _input_manager = InputManager()
 # Interface method with the global input manager object.
 update_inputs = _input_manager.update_inputs
 load_bindings = _input_manager.load_bindings
+set_session = _input_manager.set_session
+begin_frame = _input_manager.begin_frame
+get_events = _input_manager.get_events
+put_back = _input_manager.put_back
 active_bindings = _input_manager.active_bindings
 mouse_state = _input_manager.mouse_state
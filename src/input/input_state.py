@@ -1,11 +1,12 @@
+import typing
 import pygame as pg
 
 
 class InputState:
     """Class used to updating and probing the state of the mouse and key presses.
 
-    The class stores the inputs of the current frame and the previous to distinguish between four different input
-    states.
+    The class consumes the key and mouse button events that arrived since the previous frame to distinguish between
+    four different input states, so its cost depends on the number of events rather than on the size of the keyboard.
 
     Implementation based on the content in Chapter 5: Input of Game Programming Algorithms and Techniques by
     Sanjay Madhav.
@@ -14,43 +15,104 @@ class InputState:
     MOUSE_LEFT, MOUSE_CENTER, MOUSE_RIGHT = 0, 1, 2
 
     def __init__(self):
-        # Keyboard state boolean list.
-        self._current_keys = pg.key.get_pressed()
-        self._prev_keys = None
+        # Keycodes and mouse buttons currently held down.
+        self._held_keys = set()
+        self._held_mouse = set()
+        # Keycodes and mouse buttons that went down or up since the previous frame.
+        self._pressed_keys, self._released_keys = set(), set()
+        self._pressed_mouse, self._released_mouse = set(), set()
+        # Time, in milliseconds since pg.init, at which the latest transition of each keycode and mouse button was
+        # processed. Events carry no time of their own, so this is when the frame handled them, not when they happened.
+        self._key_processed = {}
+        self._mouse_processed = {}
+        # Latest mouse position reported by a mouse event.
+        self._mouse_pos = (0, 0)
 
-        # Mouse state boolean list.
-        self.current_mouse = pg.mouse.get_pressed(num_buttons=3)
-        self.prev_mouse = None
+    def update(self, events: typing.Iterable[pg.event.Event]) -> None:
+        """Forgets the transitions of the previous frame and applies the key and mouse events of this one.
 
-    def update(self):
-        """Stores the previous mouse and key states, and sets their new states."""
-        self._prev_keys = self._current_keys
-        self._current_keys = pg.key.get_pressed()
+        :param events: Events fetched from the event queue this frame; other event types are ignored.
+        :return: None
+        """
+        self._pressed_keys.clear()
+        self._released_keys.clear()
+        self._pressed_mouse.clear()
+        self._released_mouse.clear()
+        # Every event of the frame is processed at once, so they share one time.
+        now = pg.time.get_ticks()
+        for event in events:
+            if event.type in (pg.MOUSEMOTION, pg.MOUSEBUTTONDOWN, pg.MOUSEBUTTONUP):
+                self._mouse_pos = event.pos
+            if event.type == pg.KEYDOWN:
+                self._press(event.key, self._held_keys, self._pressed_keys, self._key_processed, now)
+            elif event.type == pg.KEYUP:
+                self._release(event.key, self._held_keys, self._released_keys, self._key_processed, now)
+            elif event.type == pg.MOUSEBUTTONDOWN:
+                # Event buttons start at 1 for the left button.
+                self._press(event.button - 1, self._held_mouse, self._pressed_mouse, self._mouse_processed, now)
+            elif event.type == pg.MOUSEBUTTONUP:
+                self._release(event.button - 1, self._held_mouse, self._released_mouse, self._mouse_processed,
+                              now)
 
-        self.prev_mouse = self.current_mouse
-        self.current_mouse = pg.mouse.get_pressed(num_buttons=3)
+    @staticmethod
+    def _press(code, held, pressed, processed, now):
+        held.add(code)
+        pressed.add(code)
+        processed[code] = now
+
+    @staticmethod
+    def _release(code, held, released, processed, now):
+        held.discard(code)
+        released.add(code)
+        processed[code] = now
 
     def get_key_state(self, keycode: int) -> int:
         """Returns the current state of the keyboard whose keycode has been specified."""
-        return self._get_state(self._prev_keys, self._current_keys, keycode)
+        return self._get_state(self._held_keys, self._pressed_keys, self._released_keys, keycode)
 
     def get_mouse_state(self, button: int) -> int:
         """Returns the current state of the mouse button specified."""
-        return self._get_state(self.prev_mouse, self.current_mouse, button)
+        return self._get_state(self._held_mouse, self._pressed_mouse, self._released_mouse, button)
+
+    def get_key_processed_time(self, keycode: int) -> typing.Optional[int]:
+        """Returns when the key last going down or up was processed, in milliseconds since pg.init, or None if never.
+
+        This is the time of the frame that handled the event, which is later than the key press itself after an idle
+        wait or a slow frame.
+        """
+        return self._key_processed.get(keycode)
+
+    def get_mouse_processed_time(self, button: int) -> typing.Optional[int]:
+        """Returns when the mouse button last going down or up was processed, as with get_key_processed_time."""
+        return self._mouse_processed.get(button)
+
+    def changed_keys(self) -> typing.Set[int]:
+        """Returns the keycodes that are held or that went down or up since the previous frame."""
+        return self._held_keys | self._pressed_keys | self._released_keys
+
+    def changed_mouse_buttons(self) -> typing.Set[int]:
+        """Returns the mouse buttons that are held or that went down or up since the previous frame."""
+        return self._held_mouse | self._pressed_mouse | self._released_mouse
+
+    def get_mouse_pos(self) -> typing.Tuple[int, int]:
+        """Returns the mouse position as of the latest mouse event."""
+        return self._mouse_pos
+
+    def any_mouse_pressed(self) -> bool:
+        """Returns whether any mouse button is held down."""
+        return bool(self._held_mouse)
 
     @classmethod
-    def _get_state(cls, prev, current, keycode):
-        """Gets the current state of the keycode specified."""
-        if prev[keycode]:
-            if current[keycode]:
-                return InputState.STILL_PRESSED
-            else:
-                return InputState.JUST_RELEASED
-        else:
-            if current[keycode]:
+    def _get_state(cls, held, pressed, released, code):
+        """Gets the current state of the keycode or button specified."""
+        # A press and release within the same frame counts as a release, so quick clicks are not lost.
+        if code in released:
+            return InputState.JUST_RELEASED
+        if code in held:
+            if code in pressed:
                 return InputState.JUST_PRESSED
-            else:
-                return InputState.STILL_RELEASED
+            return InputState.STILL_PRESSED
+        return InputState.STILL_RELEASED
 
 
 # Global object for checking input states.
@@ -58,4 +120,10 @@ _input_state = InputState()
 # Interface methods for the global InputState object.
 get_key_state = _input_state.get_key_state
 get_mouse_state = _input_state.get_mouse_state
+get_key_processed_time = _input_state.get_key_processed_time
+get_mouse_processed_time = _input_state.get_mouse_processed_time
+changed_keys = _input_state.changed_keys
+changed_mouse_buttons = _input_state.changed_mouse_buttons
+get_mouse_pos = _input_state.get_mouse_pos
+any_mouse_pressed = _input_state.any_mouse_pressed
 update = _input_state.update
@@ -0,0 +1,237 @@
+"""Records the input events of a play session to a compact binary log, and replays them.
+
+A log starts with the seed the game dealt cards with, followed by one record per frame from the first frame after
+loading: the frame's duration in milliseconds, then the key and mouse events fetched during it. Replaying feeds the
+same events to the same frames with the same durations, so timers fire and cards are dealt exactly as recorded.
+Usage from the repository root, headless unless SDL_VIDEODRIVER is set:
+
+    python -m src.input.recording LOG [--realtime] [--repeat N]
+"""
+import os
+import sys
+import time
+import atexit
+import struct
+import typing
+import argparse
+import pygame as pg
+
+import src.config as cfg
+import src.input.input_manager as input_manager
+import src.services.preloader as preloader
+
+_MAGIC = b'MEMR'
+_VERSION = 1
+# Magic, version, and seed.
+_HEADER = struct.Struct('<4sHQ')
+# Duration of the frame in milliseconds, and number of events.
+_FRAME = struct.Struct('<HH')
+# Event kind, then its fields as listed in _FIELDS.
+_KIND = struct.Struct('<B')
+_KINDS = (pg.KEYDOWN, pg.KEYUP, pg.MOUSEBUTTONDOWN, pg.MOUSEBUTTONUP, pg.MOUSEMOTION)
+_FIELDS = {
+    pg.KEYDOWN: struct.Struct('<iH'),  # key, mod
+    pg.KEYUP: struct.Struct('<iH'),
+    pg.MOUSEBUTTONDOWN: struct.Struct('<Bhh'),  # button, x, y
+    pg.MOUSEBUTTONUP: struct.Struct('<Bhh'),
+    pg.MOUSEMOTION: struct.Struct('<hh'),  # x, y
+}
+# Frames written between flushes of the log to disk.
+_FLUSH_FRAMES = 256
+
+
+def new_path() -> str:
+    """Returns a new timestamped log file path in cfg.RECORDING_DIR."""
+    return os.path.join(cfg.RECORDING_DIR, time.strftime('session-%Y%m%d-%H%M%S.memr'))
+
+
+def _pack(event: pg.event.Event) -> bytes:
+    fields = _FIELDS[event.type]
+    if event.type in (pg.KEYDOWN, pg.KEYUP):
+        values = (event.key, event.mod)
+    elif event.type == pg.MOUSEMOTION:
+        values = event.pos
+    else:
+        values = (event.button, *event.pos)
+    return _KIND.pack(_KINDS.index(event.type)) + fields.pack(*values)
+
+
+def _unpack(data: bytes, offset: int) -> typing.Tuple[pg.event.Event, int]:
+    event_type = _KINDS[data[offset]]
+    fields = _FIELDS[event_type]
+    values = fields.unpack_from(data, offset + _KIND.size)
+    if event_type in (pg.KEYDOWN, pg.KEYUP):
+        attributes = {'key': values[0], 'mod': values[1]}
+    elif event_type == pg.MOUSEMOTION:
+        attributes = {'pos': values, 'rel': (0, 0), 'buttons': (0, 0, 0)}
+    else:
+        attributes = {'button': values[0], 'pos': values[1:]}
+    return pg.event.Event(event_type, attributes), offset + _KIND.size + fields.size
+
+
+class Recorder:
+    """Writes the seed and the key and mouse events of each frame to a log file."""
+    def __init__(self, path: str, seed: int):
+        """
+        :param path: Log file to create.
+        :param seed: Seed the game deals cards with.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._path = path
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, seed))
+        # Duration and packed events of the frame in progress, which is written once the next one begins.
+        self._dt_ms = None
+        self._events = []
+        self._frames = 0
+        # The game usually ends with sys.exit from a state, so the last frame is written at exit.
+        atexit.register(self.close)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def begin_frame(self, dt: float) -> float:
+        """Writes the previous frame, and starts collecting this one's events."""
+        self._write_frame()
+        # Clock ticks are whole milliseconds, so this is exact.
+        self._dt_ms = min(round(dt * 1000), 0xFFFF)
+        return self._dt_ms / 1000
+
+    def events(self, events: typing.List[pg.event.Event]) -> typing.List[pg.event.Event]:
+        """Keeps the key and mouse events of the frame, and passes all events through."""
+        self._events.extend(_pack(event) for event in events if event.type in _FIELDS)
+        return events
+
+    def _write_frame(self) -> None:
+        if self._dt_ms is None:
+            return
+        self._file.write(_FRAME.pack(self._dt_ms, len(self._events)))
+        self._file.write(b''.join(self._events))
+        self._events.clear()
+        self._frames += 1
+        if self._frames % _FLUSH_FRAMES == 0:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Writes the last frame and closes the log."""
+        if not self._file.closed:
+            self._write_frame()
+            self._file.close()
+
+
+class Replayer:
+    """Reads a log and feeds its frames back to the game instead of live input."""
+    def __init__(self, path: str, realtime: bool = False):
+        """
+        :param path: Log file written by a Recorder.
+        :param realtime: Whether to wait out each frame's recorded duration, rather than run frames back to back.
+        """
+        with open(path, 'rb') as f:
+            self._data = f.read()
+        magic, version, self._seed = _HEADER.unpack_from(self._data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a version {_VERSION} input log")
+        self._realtime = realtime
+        self.rewind()
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    @property
+    def finished(self) -> bool:
+        """Whether every recorded frame has been replayed."""
+        return self._offset >= len(self._data) and not self._pending
+
+    @property
+    def frames(self) -> int:
+        """Returns the number of frames replayed so far."""
+        return self._frames
+
+    def rewind(self) -> None:
+        """Starts the replay over from the first frame."""
+        self._offset = _HEADER.size
+        self._pending = None
+        self._frames = 0
+        self._elapsed = 0.0
+        self._start = None
+
+    def begin_frame(self, dt: float) -> float:
+        """Reads the next frame's events, waiting for it to be due if replaying in real time.
+
+        :return: The frame's recorded duration, or dt once the log is exhausted.
+        """
+        if self._offset >= len(self._data):
+            self._pending = None
+            return dt
+        dt_ms, count = _FRAME.unpack_from(self._data, self._offset)
+        self._offset += _FRAME.size
+        self._pending = []
+        for _ in range(count):
+            event, self._offset = _unpack(self._data, self._offset)
+            self._pending.append(event)
+        self._frames += 1
+        if self._realtime:
+            now = time.perf_counter()
+            if self._start is None:
+                self._start = now
+            self._elapsed += dt_ms / 1000
+            time.sleep(max(0.0, self._start + self._elapsed - now))
+        return dt_ms / 1000
+
+    def events(self, events: typing.List[pg.event.Event]) -> typing.List[pg.event.Event]:
+        """Returns the recorded events of the frame, ignoring live ones."""
+        pending, self._pending = self._pending or [], None
+        return pending
+
+
+def replay(game, replayer: Replayer) -> int:
+    """ Plays a log through the game from the first frame after loading.
+
+    :param game: Game created with the log's seed, or one to reuse after reseeding it.
+    :param replayer: Log to replay, which is rewound first.
+    :return: Number of frames replayed.
+    """
+    replayer.rewind()
+    game.rng.seed(replayer.seed)
+    # Loading takes however long it takes, so it is finished before the recorded frames, which start after it.
+    preloader.finish()
+    input_manager.set_session(replayer)
+    game.start()
+    try:
+        while not replayer.finished:
+            game.frame()
+    except SystemExit:
+        # The recorded session ended with the Exit button.
+        pass
+    finally:
+        input_manager.set_session(None)
+    return replayer.frames
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded input log.")
+    parser.add_argument('log')
+    parser.add_argument('--realtime', action='store_true', help="replay at the recorded speed rather than uncapped")
+    parser.add_argument('--repeat', type=int, default=1, help="number of times to replay the log")
+    args = parser.parse_args(argv)
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    cfg.FPS = 0
+    cfg.IDLE_WAIT = False
+    cfg.RECORD_INPUT = False
+
+    from src.game import Game
+    replayer = Replayer(args.log, args.realtime)
+    game = Game(seed=replayer.seed)
+    for i in range(args.repeat):
+        start = time.perf_counter()
+        frames = replay(game, replayer)
+        seconds = time.perf_counter() - start
+        print(f"replay {i + 1}: {frames} frames in {seconds:.3f} s ({frames / seconds:.0f} frames/s), "
+              f"ended in {type(game.state).__name__}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,114 @@
+"""Rules of the memory game, independent of pygame so games can be played and simulated without a display."""
+import array
+import typing
+import random
+
+
+class MemoryGame:
+    """A board of face-down cards in pairs, played by flipping two cards at a time.
+
+    The board is stored as compact arrays indexed by board position: the id of each card, and whether it is hidden,
+    revealed, or matched. Any integers can serve as card ids; cards with equal ids match.
+    """
+    # Outcomes of flip().
+    IGNORED, FIRST, MATCH, MISMATCH = 0, 1, 2, 3
+    # States of each board position.
+    HIDDEN, REVEALED, MATCHED = 0, 1, 2
+
+    def __init__(self, board: typing.Iterable[int]):
+        """Starts a game on the given board, with every card face down.
+
+        :param board: Card id at each board position, with every id appearing an even number of times.
+        """
+        self._board = array.array('H', board)
+        self._states = bytearray(len(self._board))
+        # Position of the first card of the current guess, or -1 when no guess is in progress.
+        self._first = -1
+        # Positions of a wrong guess that are still revealed, until hide_mismatch is called.
+        self._mismatch = ()
+        self._guesses = 0
+        self._pairs_left = len(self._board) // 2
+
+    @classmethod
+    def deal(cls, pairs: int, rng: typing.Optional[random.Random] = None) -> 'MemoryGame':
+        """Starts a game on a shuffled board of 'pairs' pairs, with card ids 0 to pairs - 1.
+
+        :param pairs: Number of pairs on the board.
+        :param rng: Random number generator to shuffle with; defaults to the random module's shared generator.
+        :return: The new game.
+        """
+        board = array.array('H', range(pairs)) * 2
+        (rng if rng is not None else random).shuffle(board)
+        return cls(board)
+
+    def __len__(self) -> int:
+        return len(self._board)
+
+    @property
+    def board(self) -> array.array:
+        """Returns the card id at each board position; must not be modified."""
+        return self._board
+
+    @property
+    def states(self) -> bytearray:
+        """Returns the state of each board position, one of HIDDEN, REVEALED or MATCHED; must not be modified."""
+        return self._states
+
+    @property
+    def guesses(self) -> int:
+        """Returns the number of pairs of cards flipped so far."""
+        return self._guesses
+
+    @property
+    def pairs_left(self) -> int:
+        return self._pairs_left
+
+    @property
+    def is_won(self) -> bool:
+        return self._pairs_left == 0
+
+    @property
+    def mismatch(self) -> typing.Tuple[int, ...]:
+        """Returns the positions of the wrong guess still revealed, or an empty tuple if there is none."""
+        return self._mismatch
+
+    def is_revealed(self, index: int) -> bool:
+        """Returns whether the card at the given position is showing its face, because it is revealed or matched."""
+        return self._states[index] != MemoryGame.HIDDEN
+
+    def flip(self, index: int) -> int:
+        """ Flips the card at the given position face up, hiding a wrong guess that is still revealed first.
+
+        :param index: Board position of the card.
+        :return: IGNORED if the card was already face up; FIRST if it starts a guess; otherwise MATCH or MISMATCH,
+                 depending on whether it has the same id as the first card of the guess.
+        """
+        if self._mismatch:
+            self.hide_mismatch()
+        states = self._states
+        if states[index] != MemoryGame.HIDDEN:
+            return MemoryGame.IGNORED
+        first = self._first
+        if first < 0:
+            states[index] = MemoryGame.REVEALED
+            self._first = index
+            return MemoryGame.FIRST
+        self._first = -1
+        self._guesses += 1
+        if self._board[first] == self._board[index]:
+            states[first] = states[index] = MemoryGame.MATCHED
+            self._pairs_left -= 1
+            return MemoryGame.MATCH
+        states[index] = MemoryGame.REVEALED
+        self._mismatch = (first, index)
+        return MemoryGame.MISMATCH
+
+    def hide_mismatch(self) -> typing.Tuple[int, ...]:
+        """ Flips the cards of a wrong guess back face down.
+
+        :return: Positions of the cards hidden, which are none if no wrong guess was revealed.
+        """
+        hidden, self._mismatch = self._mismatch, ()
+        for index in hidden:
+            self._states[index] = MemoryGame.HIDDEN
+        return hidden
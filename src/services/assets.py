@@ -0,0 +1,198 @@
+"""Opens the game's asset files, either from the assets directory or from a single memory-mapped asset pack.
+
+Asset names are paths relative to the assets directory with forward slashes, such as 'sound/shuffle.wav'. The
+backend is chosen by cfg.ASSET_BACKEND. Build the asset pack from the repository root with:
+
+    python -m src.services.assets [output path]
+"""
+import io
+import os
+import sys
+import mmap
+import struct
+import typing
+
+import src.config as cfg
+
+_MAGIC = b'MPAK'
+_VERSION = 1
+# Magic, version, and number of entries.
+_HEADER = struct.Struct('<4sHI')
+# Byte length of the entry's name, which follows, and the offset and length of its payload.
+_ENTRY = struct.Struct('<HQQ')
+
+
+class DirectoryAssets:
+    """Opens assets as individual files in a directory."""
+    def __init__(self, root: str = cfg.ASSETS_DIR):
+        """
+
+        :param root: Directory that asset names are relative to.
+        """
+        self._root = root
+
+    def listdir(self, directory: str) -> typing.List[str]:
+        """Returns the names of the files in the given asset directory, or an empty list if it does not exist."""
+        path = os.path.join(self._root, *directory.split('/'))
+        return os.listdir(path) if os.path.isdir(path) else []
+
+    def open(self, name: str) -> typing.BinaryIO:
+        """Opens the asset for reading; the caller closes it."""
+        return open(os.path.join(self._root, *name.split('/')), 'rb')
+
+    def stamp(self, name: str) -> typing.Tuple[int, int]:
+        """Returns the asset file's modification time in nanoseconds and its size, which change when it is edited."""
+        stat = os.stat(os.path.join(self._root, *name.split('/')))
+        return stat.st_mtime_ns, stat.st_size
+
+    def close(self) -> None:
+        pass
+
+
+class _ViewReader(io.RawIOBase):
+    """Read-only file object over a memoryview, so payloads are read in place instead of copied up front."""
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self._view) - self._pos)
+        buffer[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+class PackedAssets:
+    """Opens assets from an asset pack: an index of names, offsets and lengths followed by the raw files."""
+    def __init__(self, path: str = cfg.ASSET_PACK):
+        """Maps the asset pack into memory and reads its index; the file stays open until close is called.
+
+        :param path: Path of the asset pack.
+        """
+        self._file = open(path, 'rb')
+        self._mtime_ns = os.fstat(self._file.fileno()).st_mtime_ns
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, version, count = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {_VERSION} asset pack")
+        self._entries = {}
+        offset = _HEADER.size
+        for _ in range(count):
+            name_length, payload_offset, payload_length = _ENTRY.unpack_from(self._map, offset)
+            offset += _ENTRY.size
+            name = bytes(self._view[offset:offset + name_length]).decode('utf-8')
+            offset += name_length
+            self._entries[name] = (payload_offset, payload_length)
+
+    def listdir(self, directory: str) -> typing.List[str]:
+        """Returns the names of the files directly inside the given asset directory."""
+        prefix = directory.rstrip('/') + '/'
+        return [name[len(prefix):] for name in self._entries
+                if name.startswith(prefix) and '/' not in name[len(prefix):]]
+
+    def view(self, name: str) -> memoryview:
+        """Returns the asset's bytes as a memoryview into the mapped pack, without copying them."""
+        offset, length = self._entries[name]
+        return self._view[offset:offset + length]
+
+    def stamp(self, name: str) -> typing.Tuple[int, int]:
+        """Returns the pack's modification time in nanoseconds and the asset's size; rebuilding the pack changes them.
+
+        :raises KeyError: If the pack has no such asset.
+        """
+        return self._mtime_ns, self._entries[name][1]
+
+    def open(self, name: str) -> typing.BinaryIO:
+        """Opens the asset for reading from the mapped pack."""
+        return io.BufferedReader(_ViewReader(self.view(name)))
+
+    def close(self) -> None:
+        """Unmaps the pack and closes its file; views and readers handed out must no longer be used."""
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+
+def build_pack(path: str = cfg.ASSET_PACK, root: str = cfg.ASSETS_DIR) -> int:
+    """Writes every file under the assets directory into an asset pack.
+
+    :param path: Path of the asset pack to write.
+    :param root: Assets directory.
+    :return: Number of files packed.
+    """
+    names = []
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            names.append(os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, '/'))
+    names.sort()
+    encoded = [name.encode('utf-8') for name in names]
+    sizes = [os.path.getsize(os.path.join(root, *name.split('/'))) for name in names]
+    offset = _HEADER.size + sum(_ENTRY.size + len(name) for name in encoded)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(names)))
+        for name, size in zip(encoded, sizes):
+            f.write(_ENTRY.pack(len(name), offset, size))
+            f.write(name)
+            offset += size
+        for name in names:
+            with open(os.path.join(root, *name.split('/')), 'rb') as asset:
+                f.write(asset.read())
+    os.replace(path + '.tmp', path)
+    return len(names)
+
+
+# Global asset source; opened by init, or on first use, according to cfg.ASSET_BACKEND.
+_assets = None
+
+
+def init(source=None):
+    """Sets the global asset source, opening the one chosen by the config file unless one is given.
+
+    :param source: DirectoryAssets, PackedAssets, or a stand-in with the same methods, such as for tests.
+    :return: The global asset source.
+    """
+    global _assets
+    if source is None:
+        source = PackedAssets() if cfg.ASSET_BACKEND == cfg.PACK else DirectoryAssets()
+    _assets = source
+    return _assets
+
+
+def _get_assets():
+    return _assets if _assets is not None else init()
+
+
+def listdir(directory: str) -> typing.List[str]:
+    return _get_assets().listdir(directory)
+
+
+def open_asset(name: str) -> typing.BinaryIO:
+    return _get_assets().open(name)
+
+
+def stamp(name: str) -> typing.Tuple[int, int]:
+    return _get_assets().stamp(name)
+
+
+if __name__ == '__main__':
+    output = sys.argv[1] if len(sys.argv) > 1 else cfg.ASSET_PACK
+    count = build_pack(output)
+    print(f"Packed {count} files into {output} ({os.path.getsize(output)} bytes)")
@@ -0,0 +1,128 @@
+"""Compiles sprite sheets into binary atlas files, so startup can skip parsing XML and decoding PNGs.
+
+An atlas file holds a header identifying the source image and XML by modification time and size, the sprite names,
+a table of sprite rectangles, and optionally the sheet's raw pixels. It is stale, and ignored, as soon as either
+source changes; under the PACK asset backend, the sources are the pack's entries, which change with the pack. Build
+every atlas ahead of time from the repository root with:
+
+    python -m src.services.atlas
+"""
+import os
+import sys
+import struct
+import typing
+import xml.etree.ElementTree as ElementTree
+import pygame as pg
+
+import src.config as cfg
+import src.services.assets as assets
+
+_MAGIC = b'MATL'
+_VERSION = 1
+# Magic, version, image mtime and size, XML mtime and size, sheet width and height, whether the sheet has per-pixel
+# alpha, whether raw pixels follow the rectangles, number of sprites, and byte length of the names block.
+_HEADER = struct.Struct('<4sHqqqqIIBBII')
+
+
+def _atlas_path(sheet: dict) -> str:
+    return os.path.join(cfg.ATLAS_DIR, os.path.splitext(sheet['img'])[0] + '.atlas')
+
+
+def _stamps(sheet: dict) -> typing.Tuple[int, int, int, int]:
+    """Returns the modification time and size of the sheet's image and of its XML, from the asset source in use."""
+    return (*assets.stamp(f"images/spritesheets/{sheet['img']}"),
+            *assets.stamp(f"images/spritesheets/{sheet['xml']}"))
+
+
+def parse_xml(xml_path: typing.Union[str, typing.BinaryIO]) -> typing.Dict[str, typing.List[int]]:
+    """Reads the rectangle of every sprite from a sprite sheet's XML file.
+
+    :param xml_path: Path of the XML file, or the file itself.
+    :return: Dictionary mapping sprite names to [x, y, width, height].
+    """
+    tree = ElementTree.parse(xml_path)
+    rectangles = {}
+    for node in tree.getroot():
+        name = node.attrib['name']
+        rectangles[name] = [int(node.attrib[val]) for val in ('x', 'y', 'width', 'height')]
+    return rectangles
+
+
+def save(sheet: dict, surf: pg.Surface, rectangles: typing.Dict[str, typing.List[int]],
+         pixels: bool = True) -> str:
+    """Writes the atlas file of a sprite sheet.
+
+    :param sheet: Dictionary with keys 'img' and 'xml', as in cfg.SPRITE_SHEETS.
+    :param surf: Sheet surface as loaded from its image, before conversion to the display format.
+    :param rectangles: Dictionary mapping sprite names to [x, y, width, height].
+    :param pixels: Whether to store the sheet's raw pixels so that its image need not be decoded.
+    :return: Path of the atlas file.
+    """
+    has_alpha = bool(surf.get_alpha())
+    names = '\n'.join(rectangles).encode('utf-8')
+    flat = [value for rect in rectangles.values() for value in rect]
+    header = _HEADER.pack(_MAGIC, _VERSION, *_stamps(sheet), *surf.get_size(),
+                          has_alpha, pixels, len(rectangles), len(names))
+    path = _atlas_path(sheet)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file first so a concurrent reader never sees a partial atlas.
+    with open(path + '.tmp', 'wb') as f:
+        f.write(header)
+        f.write(names)
+        f.write(struct.pack(f'<{len(flat)}i', *flat))
+        if pixels:
+            f.write(pg.image.tostring(surf, 'RGBA' if has_alpha else 'RGB'))
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def load(sheet: dict) -> typing.Optional[typing.Tuple[typing.Optional[pg.Surface], typing.Dict[str, typing.List[int]]]]:
+    """Reads the atlas file of a sprite sheet, if it exists and is up to date with the sheet's image and XML.
+
+    :param sheet: Dictionary with keys 'img' and 'xml', as in cfg.SPRITE_SHEETS.
+    :return: The unconverted sheet surface, or None if the atlas has no pixels, and the dictionary mapping sprite
+             names to [x, y, width, height]; or None if the atlas is missing or stale.
+    """
+    try:
+        with open(_atlas_path(sheet), 'rb') as f:
+            data = f.read()
+        (magic, version, img_mtime, img_size, xml_mtime, xml_size, width, height,
+         has_alpha, pixels, count, names_length) = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            return None
+        if (img_mtime, img_size, xml_mtime, xml_size) != _stamps(sheet):
+            return None
+        # A truncated or corrupt atlas is treated like a stale one, so the sheet is loaded from its image and XML.
+        offset = _HEADER.size
+        names = data[offset:offset + names_length].decode('utf-8').split('\n')
+        offset += names_length
+        flat = struct.unpack_from(f'<{4 * count}i', data, offset)
+        offset += 16 * count
+        if len(names) != count:
+            return None
+        rectangles = {name: list(flat[4 * i:4 * i + 4]) for i, name in enumerate(names)}
+        surf = None
+        if pixels:
+            # The surface shares memory with the bytes read rather than copying them; converting it makes the copy.
+            surf = pg.image.frombuffer(memoryview(data)[offset:], (width, height), 'RGBA' if has_alpha else 'RGB')
+    except (OSError, KeyError, ValueError, struct.error):
+        return None
+    return surf, rectangles
+
+
+def build(sheets: typing.Iterable[dict] = cfg.SPRITE_SHEETS, pixels: bool = True) -> None:
+    """Compiles the atlas file of every sprite sheet from its image and XML, as read from the asset source in use.
+
+    :param sheets: Dictionaries with keys 'img' and 'xml'.
+    :param pixels: Whether to store raw pixels in the atlas files.
+    :return: None
+    """
+    for sheet in sheets:
+        img_name, xml_name = f"images/spritesheets/{sheet['img']}", f"images/spritesheets/{sheet['xml']}"
+        with assets.open_asset(img_name) as img, assets.open_asset(xml_name) as xml:
+            path = save(sheet, pg.image.load(img, img_name), parse_xml(xml), pixels)
+        print(f"Wrote {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == '__main__':
+    build(pixels='--no-pixels' not in sys.argv[1:])
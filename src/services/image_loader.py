@@ -1,75 +1,227 @@
-"""Loads sprite sheet from top-level config.py file upon import"""
+"""Loads the sprite sheets in the top-level config.py file on first use."""
 import sys
-import os
-import xml.etree.ElementTree as ElementTree
+import threading
+import functools
+import collections
+import typing
 import pygame as pg
 
 import src.config as cfg
+import src.services.assets as assets
+import src.services.atlas as atlas
+import src.services.preloader as preloader
 
 
 class _ImageLoader:
     """Provides a simple interface for getting a sprite surface."""
-    def __init__(self, *sprite_sheets):
+    def __init__(self, *sprite_sheets, load: bool = True):
         """ Loads all sprite sheets and saves each sprite's rectangle data.
 
         :param sprite_sheets: Tuple of dictionaries, with keys 'img' and 'xml', corresponding
-                              to a sheet's image and corresponding XML file.
+                              to a sheet's image and corresponding XML file, and optionally 'colorkey'.
+        :param load: Whether to load the images now; otherwise, run the jobs returned by jobs().
         """
+        self._sheet_specs = sprite_sheets
         self._sprite_sheets = []
         self._extra_images = {}
-        print("Loading images...")
-        for sheet in sprite_sheets:
+        # Maps every image name to the sheet surface it lives on and its rectangle within that sheet.
+        self._index = {}
+        # Shared subsurface views, created on first request of each image name.
+        self._views = {}
+        # Least-recently-used cache of scaled images, keyed by (name, size, smooth).
+        self._scaled = collections.OrderedDict()
+        self._scaled_lock = threading.Lock()
+        if load:
+            print("Loading images...")
+            for _, load_job, finish_job in self.jobs():
+                finish_job(load_job())
+
+    def jobs(self) -> typing.List[preloader.Job]:
+        """ Returns the work of loading the standalone images and the sprite sheets, split into jobs.
+
+        :return: For each image, its asset name, a function that decodes it on any thread, and a function that takes
+                 what the first returned, converts it to the display format and stores it, on the main thread.
+        """
+        jobs = []
+        for filename in assets.listdir('images/png'):
+            if filename.lower().endswith(".png"):
+                name = f'images/png/{filename}'
+                jobs.append((name, functools.partial(_ImageLoader._load_image, name),
+                             functools.partial(self._add_image, filename)))
+        for sheet in self._sheet_specs:
+            jobs.append((f"images/spritesheets/{sheet['img']}", functools.partial(_ImageLoader._load_sheet, sheet),
+                         functools.partial(self._add_sheet, sheet)))
+        return jobs
+
+    def _add_sheet(self, sheet: dict, loaded: typing.Tuple[pg.Surface, typing.Dict[str, typing.List[int]]]) -> None:
+        """ Converts a loaded sprite sheet to the display format and indexes its images."""
+        surf, rectangles = loaded
+        if not surf.get_alpha():
+            surf = surf.convert()
+        else:
+            surf = surf.convert_alpha()
+        if 'colorkey' in sheet:
+            # Set once on the sheet, since the views handed out inherit it and must not be changed.
+            surf.set_colorkey(sheet['colorkey'])
+        self._sprite_sheets.append({'surf': surf, 'rectangles': rectangles})
+        for name, rect in rectangles.items():
+            # Earlier sheets take precedence when names collide.
+            self._index.setdefault(name, (surf, pg.Rect(rect)))
+
+    def _add_image(self, filename: str, surf: pg.Surface) -> None:
+        """ Converts a loaded standalone image to the display format and stores it."""
+        if not surf.get_alpha():
+            surf = surf.convert()
+        else:
+            surf = surf.convert_alpha()
+        self._extra_images[filename] = surf
+
+    @staticmethod
+    def _load_sheet(sheet: dict) -> typing.Tuple[pg.Surface, typing.Dict[str, typing.List[int]]]:
+        """ Loads a sprite sheet's surface and rectangles from its atlas file, or from its image and XML if stale.
+
+        :param sheet: Dictionary with keys 'img' and 'xml'.
+        :return: The unconverted sheet surface and the dictionary mapping sprite names to [x, y, width, height].
+        """
+        img_name = f"images/spritesheets/{sheet['img']}"
+        cached = atlas.load(sheet) if cfg.ATLAS_CACHE else None
+        try:
+            if cached is not None:
+                surf, rectangles = cached
+                return (surf if surf is not None else _ImageLoader._load_image(img_name)), rectangles
+            surf = _ImageLoader._load_image(img_name)
+        except pg.error as err:
+            print(err, file=sys.stderr)
+            raise SystemExit
+        with assets.open_asset(f"images/spritesheets/{sheet['xml']}") as f:
+            rectangles = atlas.parse_xml(f)
+        if cfg.ATLAS_CACHE:
             try:
-                surf = pg.image.load(os.path.join(cfg.IMG_DIR, 'spritesheets', sheet['img']))
-                if not surf.get_alpha():
-                    surf = surf.convert()
-                else:
-                    surf = surf.convert_alpha()
-                tree = ElementTree.parse(os.path.join(cfg.IMG_DIR, 'spritesheets', sheet['xml']))
-                rectangles = {}
-                for node in tree.getroot():
-                    name = node.attrib['name']
-                    rectangles[name] = [int(node.attrib[val]) for val in ('x', 'y', 'width', 'height')]
-                self._sprite_sheets.append({'surf': surf, 'rectangles': rectangles})
-            except pg.error as err:
+                atlas.save(sheet, surf, rectangles, cfg.ATLAS_CACHE_PIXELS)
+            except OSError as err:
                 print(err, file=sys.stderr)
-                raise SystemExit
-        if os.path.isdir(os.path.join(cfg.IMG_DIR, 'png')):
-            for filename in os.listdir(os.path.join(cfg.IMG_DIR, 'png')):
-                if filename.lower().endswith(".png"):
-                    surf = pg.image.load(os.path.join(cfg.IMG_DIR, 'png', filename))
-                    if not surf.get_alpha():
-                        surf = surf.convert()
-                    else:
-                        surf = surf.convert_alpha()
-                    self._extra_images[filename] = surf
-
-    def get_image(self, name: str) -> pg.Surface:
+        return surf, rectangles
+
+    @staticmethod
+    def _load_image(name: str) -> pg.Surface:
+        """ Decodes an image from the asset source.
+
+        :param name: Asset name of the image, such as 'images/png/main-menu-splash.png'.
+        :return: The unconverted surface.
+        """
+        with assets.open_asset(name) as f:
+            return pg.image.load(f, name)
+
+    def get_image(self, name: str, copy: bool = False) -> pg.Surface:
         """ Returns a surface corresponding with the given name
 
+        By default the surface returned is shared: sprite sheet images are subsurface views into their sheet, and
+        standalone images are the loaded surface itself. Callers that draw onto the image must pass copy=True.
+
         :param name: Name of image as listed in the sprite sheet.
+        :param copy: Whether to return a new surface that is safe to draw onto.
         :return: Pygame surface corresponding to the image name 'name'
         """
-        for sprite_sheet in self._sprite_sheets:
-            if name in sprite_sheet['rectangles']:
-                return _ImageLoader._create_surface(sprite_sheet['surf'], sprite_sheet['rectangles'][name])
-        return self._extra_images[name].copy()
-
-    @classmethod
-    def _create_surface(cls, sheet_surf: pg.Surface, rect: tuple) -> pg.Surface:
-        """ Creates a pygame surface corresponding to an image on a sprite sheet.
-
-        :param sheet_surf: Sprite sheet surface from which to render image.
-        :param rect: Portion of sprite sheet surface to render into new surface.
-        :return: pygame surface corresponding to an image in the sprite sheet.
+        view = self._views.get(name)
+        if view is None:
+            if name in self._index:
+                sheet_surf, rect = self._index[name]
+                view = sheet_surf.subsurface(rect)
+            else:
+                view = self._extra_images[name]
+            self._views[name] = view
+        return view.copy() if copy else view
+
+    def get_scaled_image(self, name: str, size: typing.Tuple[int, int], smooth: bool = False) -> pg.Surface:
+        """ Returns a shared surface of the given image scaled to the given size.
+
+        Scaled images are cached, so asking for the same image at the same size again costs a dictionary lookup.
+        As with get_image, the surface returned must not be drawn onto.
+
+        :param name: Name of image as listed in the sprite sheet.
+        :param size: Width and height of the scaled image.
+        :param smooth: Whether to use pg.transform.smoothscale rather than pg.transform.scale.
+        :return: Pygame surface corresponding to the image name 'name', scaled to 'size'.
+        """
+        key = (name, tuple(size), smooth)
+        with self._scaled_lock:
+            if key in self._scaled:
+                self._scaled.move_to_end(key)
+                return self._scaled[key]
+        scale = pg.transform.smoothscale if smooth else pg.transform.scale
+        surf = scale(self.get_image(name), key[1])
+        with self._scaled_lock:
+            self._scaled[key] = surf
+            while len(self._scaled) > cfg.SCALED_IMAGE_CACHE_SIZE:
+                self._scaled.popitem(last=False)
+        return surf
+
+    def prescale(self, names: typing.Iterable[str], sizes: typing.Iterable[typing.Tuple[int, int]],
+                 smooth: bool = False, background: bool = True) -> typing.Optional[threading.Thread]:
+        """ Fills the scaled image cache with every image in 'names' at every size in 'sizes'.
+
+        :param names: Names of images as listed in the sprite sheet.
+        :param sizes: Width and height pairs to scale each image to.
+        :param smooth: Whether to use pg.transform.smoothscale rather than pg.transform.scale.
+        :param background: Whether to do the work in a daemon thread rather than before returning.
+        :return: The thread doing the work if background is True; otherwise, None.
         """
-        x, y, w, h = rect
-        image = pg.Surface((w, h))
-        image.blit(sheet_surf, (0, 0), pg.Rect(x, y, w, h))
-        return image
+        names, sizes = list(names), list(sizes)
+
+        def work():
+            for size in sizes:
+                for name in names:
+                    self.get_scaled_image(name, size, smooth)
+
+        if not background:
+            work()
+            return None
+        thread = threading.Thread(target=work, name="prescale", daemon=True)
+        thread.start()
+        return thread
+
+
+# Global image loader; created by init, or on first use, since loading requires a display mode to be set.
+_img_loader = None
+
+
+def init(loader: typing.Optional[_ImageLoader] = None) -> _ImageLoader:
+    """Sets the global image loader, loading the sprite sheets in the config file unless a loader is given.
+
+    :param loader: Image loader to use instead, such as a stand-in for tests.
+    :return: The global image loader.
+    """
+    global _img_loader
+    _img_loader = loader if loader is not None else _ImageLoader(*cfg.SPRITE_SHEETS)
+    return _img_loader
+
+
+def preload(first: typing.Iterable[str] = ()) -> None:
+    """Sets an empty global image loader and has the preloader load the images of the config file into it.
+
+    :param first: Asset names of images to load before the others, such as those needed by the main menu.
+    :return: None
+    """
+    first = set(first)
+    jobs = init(_ImageLoader(*cfg.SPRITE_SHEETS, load=False)).jobs()
+    # Sorting is stable, so images keep their order within each group.
+    for key, load, finish in sorted(jobs, key=lambda job: job[0] not in first):
+        preloader.submit(key, load, finish)
+
+
+def _get_loader() -> _ImageLoader:
+    return _img_loader if _img_loader is not None else init()
+
+
+# Globally available methods for getting a loaded image.
+def get_image(name: str, copy: bool = False) -> pg.Surface:
+    return _get_loader().get_image(name, copy)
+
+
+def get_scaled_image(name: str, size: typing.Tuple[int, int], smooth: bool = False) -> pg.Surface:
+    return _get_loader().get_scaled_image(name, size, smooth)
 
 
-# Loads all of the images for the game.
-_img_loader = _ImageLoader(*cfg.SPRITE_SHEETS)
-# Globally available method for getting a loaded image.
-get_image = _img_loader.get_image
+def prescale(names: typing.Iterable[str], sizes: typing.Iterable[typing.Tuple[int, int]],
+             smooth: bool = False, background: bool = True) -> typing.Optional[threading.Thread]:
+    return _get_loader().prescale(names, sizes, smooth, background)
@@ -0,0 +1,107 @@
+"""Loads assets on worker threads while the game loop keeps running.
+
+Each job decodes an asset on a worker thread, then finishes it on the main thread, where work that needs the
+display, such as pg.Surface.convert, is safe. Jobs finish in the order they were submitted, so submitting the assets
+needed first, first, makes them available first.
+"""
+import time
+import typing
+import collections
+import concurrent.futures
+
+import src.config as cfg
+
+# An asset's key, a function that decodes it on any thread, and a function that stores it on the main thread.
+Job = typing.Tuple[str, typing.Callable[[], typing.Any], typing.Callable[[typing.Any], None]]
+
+
+class Preloader:
+    """Runs asset loading jobs on a thread pool and finishes them on the thread that polls it."""
+    def __init__(self, workers: int = 2):
+        """
+
+        :param workers: Number of worker threads; created when the first job is submitted.
+        """
+        self._workers = workers
+        self._executor = None
+        # Jobs not yet finished, in order of submission: (key, future, finish).
+        self._jobs = collections.deque()
+        self._loaded = set()
+        self._total = 0
+        self._callbacks = []
+
+    def submit(self, key: str, load: typing.Callable[[], typing.Any],
+               finish: typing.Callable[[typing.Any], None]) -> None:
+        """Starts loading an asset in the background.
+
+        :param key: Name by which is_ready refers to the asset.
+        :param load: Function that decodes the asset; runs on a worker thread.
+        :param finish: Function that receives what load returned and stores the asset; runs on the polling thread.
+        :return: None
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(self._workers, thread_name_prefix='preload')
+        self._jobs.append((key, self._executor.submit(load), finish))
+        self._total += 1
+
+    def poll(self, budget: typing.Optional[float] = None) -> None:
+        """Finishes jobs whose loading is done and that are not waiting on an earlier job; does not block.
+
+        :param budget: Seconds after which to stop finishing jobs, leaving the rest for the next poll, so that a
+                       frame is not held up; at least one job is finished. None finishes every job that is done.
+        :return: None
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        while self._jobs and self._jobs[0][1].done():
+            self._finish_next()
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        self._run_callbacks()
+
+    def finish(self) -> None:
+        """Blocks until every job is loaded, and finishes them all."""
+        while self._jobs:
+            self._finish_next()
+        self._run_callbacks()
+
+    def _finish_next(self) -> None:
+        key, future, finish = self._jobs.popleft()
+        # Re-raises, on this thread, any exception raised while loading.
+        finish(future.result())
+        self._loaded.add(key)
+
+    def _run_callbacks(self) -> None:
+        if self._jobs:
+            return
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def when_done(self, callback: typing.Callable[[], None]) -> None:
+        """Runs the callback on the polling thread once every job has finished, or now if none are pending."""
+        self._callbacks.append(callback)
+        self._run_callbacks()
+
+    def is_ready(self, *keys: str) -> bool:
+        """Returns whether the assets with the given keys have finished loading."""
+        return all(key in self._loaded for key in keys)
+
+    def is_done(self) -> bool:
+        """Returns whether every job submitted has finished."""
+        return not self._jobs
+
+    def progress(self) -> float:
+        """Returns the fraction of jobs submitted that have finished, from 0 to 1."""
+        return (self._total - len(self._jobs)) / self._total if self._total else 1.0
+
+
+# Global preloader polled once per frame by the game loop.
+_preloader = Preloader(cfg.PRELOAD_WORKERS)
+# Interface methods for the global preloader.
+submit = _preloader.submit
+poll = _preloader.poll
+finish = _preloader.finish
+when_done = _preloader.when_done
+is_ready = _preloader.is_ready
+is_done = _preloader.is_done
+progress = _preloader.progress
@@ -0,0 +1,171 @@
+"""Times the phases of recent frames, shows their percentiles on screen, and exports them as a Chrome trace."""
+import os
+import sys
+import json
+import time
+import array
+import signal
+import typing
+import pygame as pg
+
+import src.config as cfg
+
+
+class Profiler:
+    """Keeps the phase timestamps of the last frames in a fixed-size ring buffer.
+
+    A frame is recorded as PHASES + 1 timestamps from time.perf_counter_ns: when each phase started, then when the last
+    one ended. Recording does nothing but store those numbers, and the game loop skips taking them while disabled.
+    """
+    PHASES = ('process_inputs', 'update', 'draw', 'flip')
+    _HUD_SIZE = (220, 76)
+
+    def __init__(self, capacity: int = cfg.PROFILER_FRAMES, enabled: bool = cfg.PROFILER):
+        """
+        :param capacity: Number of most recent frames kept.
+        :param enabled: Whether frames are recorded from the start.
+        """
+        self._capacity = capacity
+        self._stride = len(Profiler.PHASES) + 1
+        self._stamps = array.array('q', bytes(8 * capacity * self._stride))
+        # Number of frames recorded so far; the next one goes in slot _frames % capacity.
+        self._frames = 0
+        self.enabled = enabled
+        self._hud_visible = False
+        self._hud = None
+        self._hud_updated = 0.0
+        # Font of the percentiles; the shared text cache is left alone, so showing them does not evict menu text.
+        self._hud_font = None
+        # Set from a signal handler, which must not do the work itself.
+        self._dump_requested = False
+
+    def record(self, *stamps: int) -> None:
+        """ Stores the timestamps of a frame, overwriting the oldest frame once the buffer is full.
+
+        :param stamps: Start of each phase in PHASES, then the end of the last, from time.perf_counter_ns.
+        :return: None
+        """
+        start = (self._frames % self._capacity) * self._stride
+        self._stamps[start:start + self._stride] = array.array('q', stamps)
+        self._frames += 1
+
+    def frames(self) -> typing.List[typing.Sequence[int]]:
+        """Returns the timestamps of the recorded frames still in the buffer, oldest first."""
+        count = min(self._frames, self._capacity)
+        first = self._frames - count
+        stride = self._stride
+        return [self._stamps[(i % self._capacity) * stride:(i % self._capacity + 1) * stride]
+                for i in range(first, self._frames)]
+
+    def clear(self) -> None:
+        self._frames = 0
+
+    def percentiles(self, *qs: float) -> typing.List[float]:
+        """ Returns percentiles of the time the recorded frames took, from their first phase to the end of their last.
+
+        :param qs: Percentiles to compute, from 0 to 100.
+        :return: Each percentile in milliseconds, or all zeros if no frame is recorded.
+        """
+        times = sorted(frame[-1] - frame[0] for frame in self.frames())
+        if not times:
+            return [0.0 for _ in qs]
+        return [times[min(len(times) - 1, int(len(times) * q / 100))] / 1e6 for q in qs]
+
+    def trace(self) -> dict:
+        """Returns the recorded frames in the Chrome Trace Event format, for chrome://tracing or Perfetto."""
+        pid = os.getpid()
+        events = []
+        for frame in self.frames():
+            events.append({'name': 'frame', 'ph': 'X', 'pid': pid, 'tid': 0, 'ts': frame[0] / 1000,
+                           'dur': (frame[-1] - frame[0]) / 1000})
+            for i, name in enumerate(Profiler.PHASES):
+                events.append({'name': name, 'ph': 'X', 'pid': pid, 'tid': 0, 'ts': frame[i] / 1000,
+                               'dur': (frame[i + 1] - frame[i]) / 1000})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path: typing.Optional[str] = None) -> typing.Optional[str]:
+        """ Writes the recorded frames to a Chrome trace file, unless none were recorded.
+
+        :param path: File to write; defaults to a new timestamped file in cfg.TRACE_DIR.
+        :return: The path of the file written, or None if there was nothing to write.
+        """
+        if not self._frames:
+            print("No frames recorded, so no trace was written; set PROFILER in config.py or press F3 to record",
+                  file=sys.stderr)
+            return None
+        if path is None:
+            path = os.path.join(cfg.TRACE_DIR, time.strftime('trace-%Y%m%d-%H%M%S.json'))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f)
+        print(f"Wrote {path}", file=sys.stderr)
+        return path
+
+    def request_dump(self, *_) -> None:
+        """Asks for a trace to be written at the end of the next frame; safe to call from a signal handler."""
+        self._dump_requested = True
+
+    def install_signal_handler(self) -> None:
+        """Writes a trace whenever the process receives SIGUSR1, where the platform has it."""
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self.request_dump)
+
+    def end_frame(self) -> None:
+        """Writes a trace if one was requested."""
+        if self._dump_requested:
+            self._dump_requested = False
+            self.dump()
+
+    @property
+    def hud_visible(self) -> bool:
+        return self._hud_visible
+
+    def toggle_hud(self) -> None:
+        """Shows or hides the frame time percentiles, recording frames while they are shown."""
+        self._hud_visible = not self._hud_visible
+        if self._hud_visible:
+            self.enabled = True
+            self._hud = None
+
+    def draw_hud(self, screen: pg.Surface) -> pg.Rect:
+        """ Draws the frame time percentiles in the top left corner of the screen, refreshing them periodically.
+
+        :param screen: The display surface.
+        :return: The area of the screen drawn over.
+        """
+        now = time.perf_counter()
+        if self._hud is None or now - self._hud_updated >= cfg.PROFILER_HUD_INTERVAL:
+            self._hud_updated = now
+            self._hud = pg.Surface(Profiler._HUD_SIZE)
+            if self._hud_font is None:
+                self._hud_font = pg.font.Font(None, 22)
+            p50, p95, p99 = self.percentiles(50, 95, 99)
+            lines = (f"frames: {min(self._frames, self._capacity)}", f"p50: {p50:.2f} ms",
+                     f"p95: {p95:.2f} ms", f"p99: {p99:.2f} ms")
+            for i, line in enumerate(lines):
+                text = self._hud_font.render(line, True, cfg.WHITE)
+                self._hud.blit(text, text.get_rect(center=(Profiler._HUD_SIZE[0] / 2, 11 + i * 18)))
+        return screen.blit(self._hud, (0, 0))
+
+
+# Global profiler; created by init, or on first use.
+_profiler = None
+
+
+def init(profiler: typing.Optional[Profiler] = None) -> Profiler:
+    """Sets the global profiler, creating one from the config file unless it is given.
+
+    :param profiler: Profiler to use instead, such as one with a larger buffer.
+    :return: The global profiler.
+    """
+    global _profiler
+    _profiler = profiler if profiler is not None else Profiler()
+    return _profiler
+
+
+def get_profiler() -> Profiler:
+    return _profiler if _profiler is not None else init()
+
+
+def dump(path: typing.Optional[str] = None) -> typing.Optional[str]:
+    return get_profiler().dump(path)
@@ -1,37 +1,251 @@
-import os
+import time
+import typing
+import functools
+import collections
 import pygame as pg
 
 import src.config as cfg
+import src.services.assets as assets
+import src.services.preloader as preloader
+import src.services.timer as scheduler
 
 
 class Sound:
     """Class for handling all sounds in the game."""
-    def __init__(self):
-        """Loads all sounds and stores them."""
-        self._sfx = {}
-        print("Loading all sounds...")
-        for filename in os.listdir(cfg.SND_DIR):
-            if filename.endswith(".wav"):
-                filepath = os.path.join(cfg.SND_DIR, filename)
-                self._sfx[filename] = pg.mixer.Sound(filepath)
-
-    def play_sfx(self, filename: str) -> None:
-        """Plays a sound effect whose name is indicated by the provided filename."""
-        self._sfx[filename].play()
+    # Name of the music track currently loaded, or None if unknown; files the mixer streams music from; and the timer
+    # that starts a track once the previous one has faded out.
+    _music_name = None
+    _music_files = []
+    _pending_music = None
+    _music_counts = {'loads': 0, 'reuses': 0, 'calls': 0, 'last_stall_ms': 0.0, 'total_stall_ms': 0.0,
+                     'max_stall_ms': 0.0}
 
-    @staticmethod
-    def play_music(filename: str, loops=0) -> None:
-        pg.mixer.music.load(os.path.join(cfg.SND_DIR, filename))
-        pg.mixer.music.play(loops)
+    def __init__(self, load: bool = True):
+        """Reserves the mixer channels of each category of sound effect; sound effects are decoded on first use.
+
+        :param load: Whether to decode the sound effects in cfg.PRELOAD_SFX now; otherwise, run the jobs returned by
+                     jobs().
+        """
+        # Decoded sound effects, least recently played first, and the bytes of samples each holds.
+        self._sfx = collections.OrderedDict()
+        self._sizes = {}
+        self._decoded_bytes = 0
+        self._counts = {'hits': 0, 'decodes': 0, 'evictions': 0, 'steals': 0}
+        # Channel indices of each category, highest priority first; they are reserved so that pygame's automatic
+        # channel selection never uses them.
+        self._channels = {}
+        reserved = 0
+        for category, count in cfg.SFX_CHANNELS.items():
+            self._channels[category] = list(range(reserved, reserved + count))
+            reserved += count
+        pg.mixer.set_num_channels(max(pg.mixer.get_num_channels(), reserved))
+        pg.mixer.set_reserved(reserved)
+        # Time each channel last started playing, for stealing the oldest one.
+        self._started = [0] * reserved
+        if load:
+            print("Loading sounds...")
+            for _, load_job, finish_job in self.jobs():
+                finish_job(load_job())
+
+    def jobs(self) -> typing.List[preloader.Job]:
+        """Returns the work of decoding the sound effects in cfg.PRELOAD_SFX, split into jobs.
+
+        :return: For each sound, its asset name, a function that decodes it on any thread, and a function that stores
+                 what the first returned.
+        """
+        return [(f'sound/{filename}', functools.partial(Sound._load, filename),
+                 functools.partial(self._store, filename)) for filename in cfg.PRELOAD_SFX]
 
     @staticmethod
-    def stop_music() -> None:
-        pg.mixer.music.stop()
+    def _load(filename: str) -> pg.mixer.Sound:
+        with assets.open_asset(f'sound/{filename}') as f:
+            return pg.mixer.Sound(file=f)
+
+    def _store(self, filename: str, sfx: pg.mixer.Sound) -> None:
+        """Keeps a decoded sound effect, evicting the least recently played ones beyond the memory budget."""
+        frequency, sample_format, channels = pg.mixer.get_init()
+        size = round(sfx.get_length() * frequency) * channels * abs(sample_format) // 8
+        # The same file may be stored again, such as when it is played before its preload finishes; it replaces the
+        # sound kept before, and counts once.
+        self._decoded_bytes += size - self._sizes.get(filename, 0)
+        self._sfx[filename] = sfx
+        self._sfx.move_to_end(filename)
+        self._sizes[filename] = size
+        # A sound that is playing keeps playing after eviction, since its channel holds on to it.
+        while self._decoded_bytes > cfg.SFX_MEMORY_BUDGET and len(self._sfx) > 1:
+            evicted, _ = self._sfx.popitem(last=False)
+            self._decoded_bytes -= self._sizes.pop(evicted)
+            self._counts['evictions'] += 1
+
+    def _get_sfx(self, filename: str) -> pg.mixer.Sound:
+        sfx = self._sfx.get(filename)
+        if sfx is not None:
+            self._counts['hits'] += 1
+            self._sfx.move_to_end(filename)
+            return sfx
+        self._counts['decodes'] += 1
+        sfx = Sound._load(filename)
+        self._store(filename, sfx)
+        return sfx
+
+    def _get_channel(self, category: str) -> int:
+        """Returns a free channel of the category or of a lower priority one, or else the one playing the longest."""
+        categories = list(self._channels)
+        candidates = [index for lower in categories[categories.index(category):] for index in self._channels[lower]]
+        for index in candidates:
+            if not pg.mixer.Channel(index).get_busy():
+                return index
+        self._counts['steals'] += 1
+        return min(candidates, key=lambda index: self._started[index])
+
+    def play_sfx(self, filename: str, category: str = cfg.SFX_UI) -> None:
+        """Plays a sound effect whose name is indicated by the provided filename, decoding it first if need be.
+
+        :param filename: Name of the sound effect's file.
+        :param category: One of the keys of cfg.SFX_CHANNELS, which determines the channels it may play on.
+        :return: None
+        """
+        index = self._get_channel(category)
+        pg.mixer.Channel(index).play(self._get_sfx(filename))
+        self._started[index] = pg.time.get_ticks()
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """Returns the bytes and number of decoded sound effects, cache and channel counters, and channel usage."""
+        stats = dict(self._counts, decoded_bytes=self._decoded_bytes, decoded_sounds=len(self._sfx))
+        stats['channels'] = {category: {'busy': sum(pg.mixer.Channel(index).get_busy() for index in indices),
+                                        'total': len(indices)}
+                             for category, indices in self._channels.items()}
+        return stats
+
+    @classmethod
+    def play_music(cls, filename: str, loops=0, fade_ms=0) -> None:
+        """Plays a music track from its start, reusing it instead of reloading it if it is the track already loaded.
+
+        :param filename: Name of the music file.
+        :param loops: Number of times to repeat the track; -1 repeats it forever.
+        :param fade_ms: Milliseconds over which the current track fades out and then this one fades in.
+        :return: None
+        """
+        start = time.perf_counter()
+        cls._cancel_pending_music()
+        if fade_ms and filename != cls._music_name and pg.mixer.music.get_busy():
+            # There is only one music stream, so fade the current track out before the new one fades in.
+            pg.mixer.music.fadeout(fade_ms)
+            cls._pending_music = scheduler.schedule(fade_ms / 1000,
+                                                    lambda: cls._start_music(filename, loops, fade_ms))
+        else:
+            cls._start_music(filename, loops, fade_ms)
+        cls._record_music_stall(start)
+
+    @classmethod
+    def _start_music(cls, filename: str, loops: int, fade_ms: int) -> None:
+        cls._pending_music = None
+        if filename == cls._music_name:
+            cls._music_counts['reuses'] += 1
+        else:
+            # Music streams from its file while playing, so the file stays open until the next track is loaded.
+            music_file = assets.open_asset(f'sound/{filename}')
+            pg.mixer.music.load(music_file, filename)
+            cls._close_music_files()
+            cls._music_files.append(music_file)
+            cls._music_name = filename
+            cls._music_counts['loads'] += 1
+        pg.mixer.music.play(loops, fade_ms=fade_ms)
+
+    @classmethod
+    def queue_music(cls, filename: str, loops=0) -> None:
+        """Plays a music track once the current one ends, loading it now so that the switch does not stall.
+
+        :param filename: Name of the music file.
+        :param loops: Number of times to repeat the track; -1 repeats it forever.
+        :return: None
+        """
+        start = time.perf_counter()
+        music_file = assets.open_asset(f'sound/{filename}')
+        pg.mixer.music.queue(music_file, filename, loops)
+        cls._music_files.append(music_file)
+        # Which track is loaded depends on when the current one ends, so the next play_music reloads.
+        cls._music_name = None
+        cls._music_counts['loads'] += 1
+        cls._record_music_stall(start)
+
+    @classmethod
+    def stop_music(cls, fade_ms=0) -> None:
+        """Stops the music, keeping its track loaded so that playing it again does not reload it.
+
+        :param fade_ms: Milliseconds over which the music fades out before stopping.
+        :return: None
+        """
+        start = time.perf_counter()
+        cls._cancel_pending_music()
+        if fade_ms:
+            pg.mixer.music.fadeout(fade_ms)
+        else:
+            pg.mixer.music.stop()
+        cls._record_music_stall(start)
+
+    @classmethod
+    def music_stats(cls) -> typing.Dict[str, typing.Any]:
+        """Returns the number of tracks loaded and reused, and how long music calls held up the game, in ms."""
+        return dict(cls._music_counts)
+
+    @classmethod
+    def _cancel_pending_music(cls) -> None:
+        if cls._pending_music:
+            cls._pending_music.cancel()
+            cls._pending_music = None
+
+    @classmethod
+    def _close_music_files(cls) -> None:
+        for music_file in cls._music_files:
+            music_file.close()
+        cls._music_files.clear()
+
+    @classmethod
+    def _record_music_stall(cls, start: float) -> None:
+        stall_ms = (time.perf_counter() - start) * 1000
+        counts = cls._music_counts
+        counts['calls'] += 1
+        counts['last_stall_ms'] = stall_ms
+        counts['total_stall_ms'] += stall_ms
+        counts['max_stall_ms'] = max(counts['max_stall_ms'], stall_ms)
+
+
+# Global sound class; created by init, or on first use, since loading requires the mixer to be initialized.
+_sound_loader = None
+
+
+def init(loader: typing.Optional[Sound] = None) -> Sound:
+    """Sets the global sound class, loading all sounds unless one is given.
+
+    :param loader: Sound class to use instead, such as a stand-in for tests.
+    :return: The global sound class.
+    """
+    global _sound_loader
+    _sound_loader = loader if loader is not None else Sound()
+    return _sound_loader
+
+
+def preload() -> None:
+    """Sets the global sound class and has the preloader decode the sound effects in cfg.PRELOAD_SFX into it."""
+    for key, load, finish in init(Sound(load=False)).jobs():
+        preloader.submit(key, load, finish)
 
 
-# Global sound class.
-_sound_loader = Sound()
 # Interface methods for the global class.
-play_sfx = _sound_loader.play_sfx
+def _get_sound() -> Sound:
+    return _sound_loader if _sound_loader is not None else init()
+
+
+def play_sfx(filename: str, category: str = cfg.SFX_UI) -> None:
+    _get_sound().play_sfx(filename, category)
+
+
+def stats() -> typing.Dict[str, typing.Any]:
+    return _get_sound().stats()
+
+
 play_music = Sound.play_music
+queue_music = Sound.queue_music
 stop_music = Sound.stop_music
+music_stats = Sound.music_stats
@@ -1,21 +1,114 @@
+import os
+import sys
+import json
 import typing
+import hashlib
+import collections
 import pygame as pg
 
 # from src.settings import FONT_NAMES
 import src.config as cfg
 
 
+# Directories whose contents determine what pg.font.match_font finds, by platform.
+_FONT_DIRS = (
+    '/usr/share/fonts', '/usr/local/share/fonts', '/var/cache/fontconfig',
+    os.path.expanduser('~/.fonts'), os.path.expanduser('~/.local/share/fonts'),
+    os.path.expanduser('~/.cache/fontconfig'),
+    '/Library/Fonts', '/System/Library/Fonts', os.path.expanduser('~/Library/Fonts'),
+    os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts'),
+)
+
+
+def _font_fingerprint() -> str:
+    """Returns a string that changes whenever fonts are installed or removed, invalidating the font cache."""
+    parts = [sys.platform, pg.version.ver]
+    for directory in _FONT_DIRS:
+        try:
+            parts.append(f"{directory}:{os.stat(directory).st_mtime_ns}")
+        except OSError:
+            continue
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
 class TextRenderer:
     def __init__(self):
-        # Load all fonts
-        self._fonts = {font: pg.font.match_font(font) for font in cfg.FONT_NAMES}
+        # Font file paths by font name, resolved on first use; matching system fonts can be slow.
+        self._fonts = {}
+        # Font paths persisted from earlier runs, loaded on first use.
+        self._font_cache = None
+        # Font objects keyed by (font name, size), so font files are opened and parsed once per size.
+        self._font_objects = {}
+        # Least-recently-used cache of rendered text, keyed by (text, size, color, font name, antialias).
+        self._surfaces = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the hit and miss counts and the current size of the rendered text cache."""
+        return {'hits': self._hits, 'misses': self._misses, 'size': len(self._surfaces),
+                'fonts': len(self._font_objects)}
 
-    def _render_text_surface(self, text, size, color, font_name='arial') -> typing.Tuple[pg.Surface, pg.Rect]:
-        # Create font object
-        font_object = pg.font.Font(self._fonts[font_name], size)
+    def _get_font(self, font_name, size) -> pg.font.Font:
+        key = (font_name, size)
+        font_object = self._font_objects.get(key)
+        if font_object is None:
+            font_object = self._font_objects[key] = pg.font.Font(self._get_font_path(font_name), size)
+        return font_object
 
-        # Create a text surface
-        text_surface = font_object.render(text, True, color)
+    def _get_font_path(self, font_name) -> str:
+        """Returns the path of the font file for the given font name, consulting the on-disk cache first."""
+        path = self._fonts.get(font_name)
+        if path is not None:
+            return path
+        if self._font_cache is None:
+            self._font_cache = self._load_font_cache()
+        path = self._font_cache['fonts'].get(font_name)
+        if path is None or (path != pg.font.get_default_font() and not os.path.isfile(path)):
+            # Fall back to pygame's bundled font when no system font matches.
+            path = pg.font.match_font(font_name) or pg.font.get_default_font()
+            self._font_cache['fonts'][font_name] = path
+            self._save_font_cache()
+        self._fonts[font_name] = path
+        return path
+
+    @staticmethod
+    def _load_font_cache() -> dict:
+        """Reads the font cache file, discarding it if it is unreadable or fonts have changed since it was written."""
+        fingerprint = _font_fingerprint()
+        try:
+            with open(cfg.FONT_CACHE_FILE, 'r') as f:
+                font_cache = json.load(f)
+            if font_cache.get('fingerprint') == fingerprint and isinstance(font_cache.get('fonts'), dict):
+                return font_cache
+        except (OSError, ValueError):
+            pass
+        return {'fingerprint': fingerprint, 'fonts': {}}
+
+    def _save_font_cache(self) -> None:
+        """Writes the font cache file; failing to do so only costs matching the fonts again next run."""
+        try:
+            os.makedirs(os.path.dirname(cfg.FONT_CACHE_FILE), exist_ok=True)
+            with open(cfg.FONT_CACHE_FILE, 'w') as f:
+                json.dump(self._font_cache, f, indent=2)
+        except OSError as err:
+            print(err, file=sys.stderr)
+
+    def _render_text_surface(self, text, size, color, font_name='arial',
+                             antialias=True) -> typing.Tuple[pg.Surface, pg.Rect]:
+        # Rendered surfaces are shared; callers only blit them.
+        key = (text, size, tuple(color), font_name, antialias)
+        text_surface = self._surfaces.get(key)
+        if text_surface is not None:
+            self._hits += 1
+            self._surfaces.move_to_end(key)
+        else:
+            self._misses += 1
+            # Create a text surface
+            text_surface = self._get_font(font_name, size).render(text, antialias, color)
+            self._surfaces[key] = text_surface
+            if len(self._surfaces) > cfg.TEXT_CACHE_SIZE:
+                self._surfaces.popitem(last=False)
         text_rect = text_surface.get_rect()
         return text_surface, text_rect
 
@@ -52,7 +145,32 @@ class TextRenderer:
         surface.blit(text_surface, text_rect)
 
 
-_text_renderer = TextRenderer()
+# Global text renderer; created by init, or on first use.
+_text_renderer = None
+
+
+def init(renderer: typing.Optional[TextRenderer] = None) -> TextRenderer:
+    """Sets the global text renderer, creating one unless it is given.
+
+    :param renderer: Text renderer to use instead, such as a stand-in for tests.
+    :return: The global text renderer.
+    """
+    global _text_renderer
+    _text_renderer = renderer if renderer is not None else TextRenderer()
+    return _text_renderer
+
+
+def _get_renderer() -> TextRenderer:
+    return _text_renderer if _text_renderer is not None else init()
+
+
+def render(surface, text, size, color, location='c', font_name='arial') -> None:
+    _get_renderer().render(surface, text, size, color, location, font_name)
+
+
+def render_pos(surface, x, y, text, size, color, font_name='arial') -> None:
+    _get_renderer().render_pos(surface, x, y, text, size, color, font_name)
+
 
-render = _text_renderer.render
-render_pos = _text_renderer.render_pos
+def stats() -> typing.Dict[str, int]:
+    return _get_renderer().stats()
@@ -0,0 +1,103 @@
+import typing
+
+
+class Timer:
+    """A callback scheduled to run once after a delay, measured in game time."""
+    def __init__(self, delay: float, callback: typing.Callable[[], None]):
+        """
+
+        :param delay: Seconds until the callback runs.
+        :param callback: Function to run once the delay has elapsed.
+        """
+        self.remaining = delay
+        self._callback = callback
+        self._active = True
+        self._paused = False
+
+    @property
+    def active(self) -> bool:
+        """Whether the callback has yet to run and the timer has not been cancelled."""
+        return self._active
+
+    @property
+    def paused(self) -> bool:
+        """Whether the timer is held, so that game time passing does not bring its callback closer."""
+        return self._paused
+
+    def pause(self) -> None:
+        """Holds the timer where it is until it is resumed."""
+        self._paused = True
+
+    def resume(self) -> None:
+        """Lets the timer count down again from where it was paused."""
+        self._paused = False
+
+    def cancel(self) -> None:
+        """Prevents the callback from running."""
+        self._active = False
+
+    def fire(self) -> None:
+        """Runs the callback now, if it has not run and has not been cancelled."""
+        if self._active:
+            self._active = False
+            self._callback()
+
+
+class Scheduler:
+    """Runs delayed callbacks as the game loop advances, without blocking it."""
+    def __init__(self):
+        self._timers = []
+
+    def schedule(self, delay: float, callback: typing.Callable[[], None]) -> Timer:
+        """Schedules a callback to run after a delay.
+
+        :param delay: Seconds of game time until the callback runs.
+        :param callback: Function to run once the delay has elapsed.
+        :return: Timer that can be used to cancel or fast-forward the callback.
+        """
+        timer = Timer(delay, callback)
+        self._timers.append(timer)
+        return timer
+
+    def update(self, dt: float) -> None:
+        """Advances all timers that are not paused and runs the callbacks of those that are due.
+
+        :param dt: Time elapsed since the last update, in seconds.
+        :return: None
+        """
+        # Callbacks may schedule new timers; those are first advanced on the next update.
+        timers, self._timers = self._timers, []
+        for timer in timers:
+            if not timer.paused:
+                timer.remaining -= dt
+            if timer.active and not timer.paused and timer.remaining <= 0:
+                timer.fire()
+            elif timer.active:
+                self._timers.append(timer)
+
+    def next_due(self) -> typing.Optional[float]:
+        """Returns the seconds until the earliest pending callback is due, or None if none is counting down."""
+        remaining = [timer.remaining for timer in self._timers if timer.active and not timer.paused]
+        return min(remaining) if remaining else None
+
+    def fast_forward(self) -> None:
+        """Runs every pending callback immediately."""
+        timers, self._timers = self._timers, []
+        for timer in timers:
+            timer.fire()
+
+    def clear(self) -> None:
+        """Cancels every pending callback."""
+        for timer in self._timers:
+            timer.cancel()
+        self._timers.clear()
+
+
+# Global scheduler advanced once per frame by the game loop.
+_scheduler = Scheduler()
+# Interface methods for the global scheduler.
+schedule = _scheduler.schedule
+update = _scheduler.update
+next_due = _scheduler.next_due
+fast_forward = _scheduler.fast_forward
+clear = _scheduler.clear
@@ -0,0 +1,238 @@
+"""Simulates many memory games at once with NumPy, to see how many guesses players need at each difficulty.
+
+Each batch of games is a 2D array with one board of pair ids per row, plus per-board masks of the cards that are
+matched and of the cards the player remembers. Every game in the batch takes its next guess in the same step.
+NumPy, listed in requirements.txt, is only needed here, not by the game. Usage from the repository root:
+
+    python -m src.simulation.batch [games] [--player random|perfect|limited] [--forget P] [--seed S]
+"""
+import sys
+import time
+import typing
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import src.config as cfg
+
+
+class Player:
+    """Model of how a player remembers cards between guesses.
+
+    Every player flips a remembered pair when it knows one. Otherwise it flips a card it has not seen, then that
+    card's partner if it remembers where it is, or else another card it has not seen. Subclasses decide what is
+    remembered after each guess.
+    """
+    name = 'perfect'
+
+    def forget(self, known: 'np.ndarray', rng: 'np.random.Generator') -> None:
+        """ Clears, in place, the cards forgotten after a guess; by default, nothing is forgotten.
+
+        :param known: Boolean array, one row per game, of the board positions whose card the player remembers.
+        :param rng: Random number generator to forget with.
+        :return: None
+        """
+
+
+class RandomPlayer(Player):
+    """Remembers nothing, so every guess is two cards chosen at random."""
+    name = 'random'
+
+    def forget(self, known: 'np.ndarray', rng: 'np.random.Generator') -> None:
+        known[:] = False
+
+
+class LimitedMemoryPlayer(Player):
+    """Forgets each remembered card with the same probability after every guess."""
+    name = 'limited'
+
+    def __init__(self, forget: float = 0.1):
+        """
+        :param forget: Probability, from 0 to 1, of forgetting a remembered card after each guess.
+        """
+        self._forget = forget
+
+    def forget(self, known: 'np.ndarray', rng: 'np.random.Generator') -> None:
+        known &= rng.random(known.shape) >= self._forget
+
+
+# Player models by name, as accepted on the command line.
+PLAYERS = {player.name: player for player in (RandomPlayer, Player, LimitedMemoryPlayer)}
+
+
+class SimulationResult:
+    """Distribution of the guesses needed to win a number of simulated games."""
+    def __init__(self, pairs: int, player: Player, histogram: 'np.ndarray', seconds: float):
+        """
+        :param pairs: Number of pairs on each board.
+        :param player: Player model the games were played with.
+        :param histogram: Number of games won in each number of guesses, indexed by that number.
+        :param seconds: Time taken to simulate the games.
+        """
+        self._pairs = pairs
+        self._player = player
+        self._histogram = histogram
+        self._seconds = seconds
+
+    @property
+    def pairs(self) -> int:
+        return self._pairs
+
+    @property
+    def player(self) -> Player:
+        return self._player
+
+    @property
+    def histogram(self) -> 'np.ndarray':
+        """Returns the number of games won in each number of guesses, indexed by that number."""
+        return self._histogram
+
+    @property
+    def games(self) -> int:
+        return int(self._histogram.sum())
+
+    @property
+    def seconds(self) -> float:
+        return self._seconds
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self._seconds if self._seconds else float('inf')
+
+    @property
+    def mean(self) -> float:
+        """Returns the average number of guesses needed to win."""
+        return float(np.arange(len(self._histogram)) @ self._histogram) / self.games
+
+    def percentile(self, q: float) -> int:
+        """Returns the smallest number of guesses within which at least q percent of the games were won."""
+        return int(np.searchsorted(np.cumsum(self._histogram), self.games * q / 100))
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("the batch simulator requires NumPy: pip install numpy")
+
+
+def deal(games: int, pairs: int, rng: 'np.random.Generator') -> 'np.ndarray':
+    """ Deals shuffled boards of pair ids, one per row.
+
+    :param games: Number of boards.
+    :param pairs: Number of pairs on each board.
+    :param rng: Random number generator to shuffle with.
+    :return: Array of shape (games, 2 * pairs) in which each id from 0 to pairs - 1 appears twice per row.
+    """
+    _require_numpy()
+    boards = np.broadcast_to(np.arange(pairs, dtype=np.int16).repeat(2), (games, 2 * pairs))
+    return rng.permuted(boards, axis=1)
+
+
+def _partners(boards: 'np.ndarray') -> 'np.ndarray':
+    """Returns, for every board position, the position of the other card with the same pair id."""
+    order = np.argsort(boards, axis=1, kind='stable')
+    partners = np.empty_like(order)
+    rows = np.arange(len(boards))[:, None]
+    partners[rows, order[:, 0::2]] = order[:, 1::2]
+    partners[rows, order[:, 1::2]] = order[:, 0::2]
+    return partners
+
+
+def _pick(candidates: 'np.ndarray', rng: 'np.random.Generator') -> 'np.ndarray':
+    """Returns the position of a random candidate in each row; every row must have at least one."""
+    keys = rng.random(candidates.shape)
+    keys[~candidates] = -1
+    return keys.argmax(axis=1)
+
+
+def play(boards: 'np.ndarray', player: Player, rng: 'np.random.Generator') -> 'np.ndarray':
+    """ Plays every board to the end, one guess per board per step.
+
+    :param boards: Boards of pair ids, one per row, such as returned by deal.
+    :param player: Player model making the guesses.
+    :param rng: Random number generator the player chooses and forgets with.
+    :return: Number of guesses each game took to win.
+    """
+    _require_numpy()
+    games = len(boards)
+    partners = _partners(boards)
+    matched = np.zeros(boards.shape, dtype=bool)
+    known = np.zeros(boards.shape, dtype=bool)
+    guesses = np.zeros(games, dtype=np.int32)
+    # Indices into 'guesses' of the games still being played; finished games are dropped from the arrays.
+    playing = np.arange(games)
+    while len(playing):
+        rows = np.arange(len(playing))
+        unmatched = ~matched
+        unknown = unmatched & ~known
+        # A remembered pair is flipped first.
+        known_pairs = known & unmatched & np.take_along_axis(known, partners, axis=1)
+        has_pair = known_pairs.any(axis=1)
+        first = np.where(has_pair, known_pairs.argmax(axis=1),
+                         _pick(np.where(unknown.any(axis=1)[:, None], unknown, unmatched), rng))
+        # The first card's partner is flipped if it is remembered; otherwise, another card not yet seen.
+        partner = partners[rows, first]
+        unknown[rows, first] = False
+        others = unmatched.copy()
+        others[rows, first] = False
+        second = np.where(known[rows, partner], partner,
+                          _pick(np.where(unknown.any(axis=1)[:, None], unknown, others), rng))
+
+        guesses[playing] += 1
+        known[rows, first] = known[rows, second] = True
+        hit = second == partner
+        matched[rows[hit], first[hit]] = matched[rows[hit], second[hit]] = True
+        player.forget(known, rng)
+
+        won = matched.all(axis=1)
+        if won.any():
+            left = ~won
+            playing, boards, partners = playing[left], boards[left], partners[left]
+            matched, known = matched[left], known[left]
+    return guesses
+
+
+def simulate(pairs: int, games: int, player: typing.Optional[Player] = None, seed: typing.Optional[int] = None,
+             batch_size: int = 100_000) -> SimulationResult:
+    """ Simulates games in batches and collects the number of guesses each took.
+
+    :param pairs: Number of pairs on each board, such as a value of cfg.PAIRS_BY_DIFFICULTY.
+    :param games: Number of games to simulate.
+    :param player: Player model; defaults to one with perfect memory.
+    :param seed: Seed of the random number generator, for repeatable results.
+    :param batch_size: Most games simulated at once, which bounds memory use.
+    :return: The distribution of guesses and the time taken.
+    """
+    _require_numpy()
+    player = player if player is not None else Player()
+    rng = np.random.default_rng(seed)
+    histogram = np.zeros(0, dtype=np.int64)
+    start = time.perf_counter()
+    for done in range(0, games, batch_size):
+        counts = np.bincount(play(deal(min(batch_size, games - done), pairs, rng), player, rng))
+        if len(counts) > len(histogram):
+            histogram = np.pad(histogram, (0, len(counts) - len(histogram)))
+        histogram[:len(counts)] += counts
+    return SimulationResult(pairs, player, histogram, time.perf_counter() - start)
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate memory games at every difficulty.")
+    parser.add_argument('games', nargs='?', type=int, default=100_000, help="games per difficulty")
+    parser.add_argument('--player', choices=sorted(PLAYERS), default='perfect')
+    parser.add_argument('--forget', type=float, default=0.1, help="chance to forget a card per guess (limited)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    player = LimitedMemoryPlayer(args.forget) if args.player == 'limited' else PLAYERS[args.player]()
+
+    print(f"{'difficulty':<10} {'pairs':>5} {'mean':>8} {'p50':>5} {'p95':>5} {'p99':>5} {'games/s':>10}")
+    for difficulty, pairs in cfg.PAIRS_BY_DIFFICULTY.items():
+        result = simulate(pairs, args.games, player, args.seed)
+        print(f"{difficulty:<10} {pairs:>5} {result.mean:>8.2f} {result.percentile(50):>5} "
+              f"{result.percentile(95):>5} {result.percentile(99):>5} {result.games_per_second:>10.0f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
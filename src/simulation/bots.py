@@ -0,0 +1,125 @@
+"""Bots that play the memory game engine, one flip at a time, seeing only the cards they flip."""
+import abc
+import random
+import typing
+
+from src.memory_game import MemoryGame
+
+
+class Bot(abc.ABC):
+    """Strategy for playing a game to the end."""
+    @abc.abstractmethod
+    def play(self, game: MemoryGame, rng: random.Random) -> None:
+        """ Flips cards until the game is won.
+
+        :param game: Game to play, with every card face down.
+        :param rng: Random number generator to choose and forget with.
+        :return: None
+        """
+
+    @property
+    @abc.abstractmethod
+    def spec(self) -> str:
+        """Returns the name that make_bot turns back into this bot."""
+
+
+class RandomBot(Bot):
+    """Remembers nothing, so every guess is two cards chosen at random."""
+    def play(self, game: MemoryGame, rng: random.Random) -> None:
+        unmatched = list(range(len(game)))
+        while unmatched:
+            first, second = rng.sample(unmatched, 2)
+            game.flip(first)
+            if game.flip(second) == MemoryGame.MATCH:
+                unmatched.remove(first)
+                unmatched.remove(second)
+
+    @property
+    def spec(self) -> str:
+        return 'random'
+
+
+class MemoryBot(Bot):
+    """Flips a remembered pair when it knows one; otherwise a card it has not seen, then that card's partner if it
+    remembers where it is, or else another card it has not seen.
+    """
+    def __init__(self, forget: float = 0.0):
+        """
+        :param forget: Probability, from 0 to 1, of forgetting each remembered card after every guess; with 0, the
+                       bot has perfect memory.
+        """
+        self._forget = forget
+
+    def play(self, game: MemoryGame, rng: random.Random) -> None:
+        board = game.board
+        unseen = list(range(len(game)))
+        # Position of each card id seen exactly once and not matched, and positions of pairs seen but not matched.
+        seen = {}
+        known_pairs = []
+        while not game.is_won:
+            if known_pairs:
+                first, second = known_pairs.pop()
+                game.flip(first)
+                game.flip(second)
+            else:
+                first = self._take(unseen, rng)
+                game.flip(first)
+                card_id = board[first]
+                if card_id in seen:
+                    game.flip(seen.pop(card_id))
+                else:
+                    second = self._take(unseen, rng)
+                    game.flip(second)
+                    other_id = board[second]
+                    if other_id != card_id:
+                        seen[card_id] = first
+                        if other_id in seen:
+                            known_pairs.append((seen.pop(other_id), second))
+                        else:
+                            seen[other_id] = second
+            if self._forget:
+                self._forget_cards(board, unseen, seen, known_pairs, rng)
+
+    def _forget_cards(self, board: typing.Sequence[int], unseen: list, seen: dict, known_pairs: list,
+                      rng: random.Random) -> None:
+        """Returns each remembered card to the unseen cards with probability 'forget'."""
+        forget = self._forget
+        for card_id, position in list(seen.items()):
+            if rng.random() < forget:
+                del seen[card_id]
+                unseen.append(position)
+        for pair in list(known_pairs):
+            kept = [position for position in pair if rng.random() >= forget]
+            if len(kept) < 2:
+                known_pairs.remove(pair)
+                unseen.extend(position for position in pair if position not in kept)
+                # A pair with one card forgotten is still half remembered.
+                for position in kept:
+                    seen[board[position]] = position
+
+    @staticmethod
+    def _take(unseen: list, rng: random.Random) -> int:
+        """Removes and returns a random position from the unseen cards."""
+        i = rng.randrange(len(unseen))
+        unseen[i], unseen[-1] = unseen[-1], unseen[i]
+        return unseen.pop()
+
+    @property
+    def spec(self) -> str:
+        return f'limited:{self._forget:g}' if self._forget else 'perfect'
+
+
+def make_bot(spec: str) -> Bot:
+    """ Creates a bot from its name: 'random', 'perfect', or 'limited:P' to forget with probability P.
+
+    :param spec: Name of the bot, as returned by its spec property.
+    :return: The bot.
+    """
+    name, _, param = spec.partition(':')
+    if name == 'random':
+        return RandomBot()
+    if name == 'perfect':
+        return MemoryBot()
+    if name == 'limited':
+        return MemoryBot(float(param) if param else 0.1)
+    raise ValueError(f"unknown bot '{spec}'; expected 'random', 'perfect' or 'limited:P'")
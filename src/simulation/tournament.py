@@ -0,0 +1,193 @@
+"""Plays bots against many boards of any size across worker processes, and reports their guess distributions.
+
+The games of each bot and board size are split into chunks, each played in a worker process with its own seed, so a
+run gives the same results however many workers play it. Results are merged as chunks finish, and with a checkpoint
+file an interrupted run resumes where it stopped. Usage from the repository root:
+
+    python -m src.simulation.tournament [--bots random perfect limited:0.1] [--pairs 8 18 32] [--games N]
+                                        [--chunk N] [--workers N] [--seed S] [--checkpoint FILE]
+"""
+import os
+import sys
+import json
+import time
+import random
+import typing
+import argparse
+import collections
+import concurrent.futures
+
+import src.config as cfg
+from src.memory_game import MemoryGame
+from src.simulation.bots import make_bot
+
+# A chunk of work: bot spec, pairs per board, chunk number, and number of games.
+Unit = typing.Tuple[str, int, int, int]
+
+# Seconds between checkpoint writes while a run is in progress.
+CHECKPOINT_INTERVAL = 5.0
+
+
+def run_unit(seed: int, unit: Unit) -> dict:
+    """ Plays the games of a chunk; runs in a worker process.
+
+    :param seed: Seed of the whole run; each chunk derives its own from it.
+    :param unit: The chunk to play.
+    :return: The chunk, the number of games won in each number of guesses, the time taken, and the worker's pid.
+    """
+    spec, pairs, chunk, games = unit
+    rng = random.Random(f"{seed}/{spec}/{pairs}/{chunk}")
+    bot = make_bot(spec)
+    counts = collections.Counter()
+    start = time.perf_counter()
+    for _ in range(games):
+        game = MemoryGame.deal(pairs, rng)
+        bot.play(game, rng)
+        counts[game.guesses] += 1
+    return {'unit': unit, 'counts': counts, 'seconds': time.perf_counter() - start, 'worker': os.getpid()}
+
+
+class Tournament:
+    """Every bot playing a number of games on boards of every size."""
+    def __init__(self, bots: typing.Iterable[str], pairs: typing.Iterable[int], games: int, chunk: int = 1000,
+                 seed: int = 0, checkpoint: typing.Optional[str] = None):
+        """
+        :param bots: Bot specs, as accepted by make_bot.
+        :param pairs: Board sizes, in pairs.
+        :param games: Games each bot plays at each board size.
+        :param chunk: Games per unit of work sent to a worker.
+        :param seed: Seed the chunks derive theirs from, for repeatable results.
+        :param checkpoint: JSON file that progress is saved to and resumed from, if any.
+        """
+        self._params = {'bots': [make_bot(spec).spec for spec in bots], 'pairs': list(pairs), 'games': games,
+                        'chunk': chunk, 'seed': seed}
+        self._checkpoint = checkpoint
+        # Number of games won in each number of guesses, by bot spec and pairs.
+        self._histograms = collections.defaultdict(collections.Counter)
+        self._done = set()
+        # Chunks, games and busy seconds of each worker process in this run.
+        self._workers = collections.defaultdict(lambda: [0, 0, 0.0])
+        self._seconds = 0.0
+        if checkpoint and os.path.exists(checkpoint):
+            self._load()
+
+    @staticmethod
+    def _key(spec: str, pairs: int) -> str:
+        return f"{spec}/{pairs}"
+
+    def units(self) -> typing.List[Unit]:
+        """Returns every chunk of the tournament, including those already played."""
+        games, chunk = self._params['games'], self._params['chunk']
+        return [(spec, pairs, i, min(chunk, games - start))
+                for spec in self._params['bots'] for pairs in self._params['pairs']
+                for i, start in enumerate(range(0, games, chunk))]
+
+    def _load(self) -> None:
+        with open(self._checkpoint) as f:
+            saved = json.load(f)
+        if saved['params'] != self._params:
+            raise ValueError(f"checkpoint {self._checkpoint} is for a different tournament: {saved['params']}")
+        self._done = {tuple(unit) for unit in saved['done']}
+        for key, counts in saved['histograms'].items():
+            self._histograms[key].update({int(guesses): count for guesses, count in counts.items()})
+
+    def _save(self) -> None:
+        """Writes the checkpoint file, replacing the previous one only once the new one is complete."""
+        os.makedirs(os.path.dirname(os.path.abspath(self._checkpoint)), exist_ok=True)
+        with open(self._checkpoint + '.tmp', 'w') as f:
+            json.dump({'params': self._params, 'done': sorted(self._done), 'histograms': self._histograms}, f)
+        os.replace(self._checkpoint + '.tmp', self._checkpoint)
+
+    def run(self, workers: typing.Optional[int] = None, progress: bool = True) -> None:
+        """ Plays the chunks not played yet, merging each one's results as it finishes.
+
+        :param workers: Number of worker processes; defaults to the number of CPUs.
+        :param progress: Whether to print the share of chunks done as they finish.
+        :return: None
+        """
+        units = self.units()
+        pending = collections.deque(unit for unit in units if unit not in self._done)
+        workers = workers or os.cpu_count() or 1
+        start = last_save = time.perf_counter()
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            # Only a few chunks per worker are queued at once, so memory use does not grow with the run's length.
+            running = set()
+            while pending or running:
+                while pending and len(running) < 2 * workers:
+                    running.add(executor.submit(run_unit, self._params['seed'], pending.popleft()))
+                finished, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    self._merge(future.result())
+                if self._checkpoint and time.perf_counter() - last_save >= CHECKPOINT_INTERVAL:
+                    self._save()
+                    last_save = time.perf_counter()
+                if progress:
+                    print(f"\r{len(self._done)}/{len(units)} chunks", end='', file=sys.stderr, flush=True)
+        if progress:
+            print(file=sys.stderr)
+        self._seconds += time.perf_counter() - start
+        if self._checkpoint:
+            self._save()
+
+    def _merge(self, result: dict) -> None:
+        spec, pairs, _, games = result['unit']
+        self._histograms[self._key(spec, pairs)].update(result['counts'])
+        self._done.add(tuple(result['unit']))
+        worker = self._workers[result['worker']]
+        worker[0] += 1
+        worker[1] += games
+        worker[2] += result['seconds']
+
+    def histogram(self, spec: str, pairs: int) -> typing.Dict[int, int]:
+        """Returns the number of games the bot won in each number of guesses at the given board size."""
+        return self._histograms[self._key(make_bot(spec).spec, pairs)]
+
+    def report(self) -> None:
+        """Prints each bot's guess distribution at each board size, then the throughput of each worker process."""
+        print(f"{'bot':<14} {'pairs':>5} {'games':>9} {'mean':>8} {'p50':>5} {'p95':>5} {'p99':>5}")
+        for spec in self._params['bots']:
+            for pairs in self._params['pairs']:
+                counts = self.histogram(spec, pairs)
+                games = sum(counts.values())
+                if not games:
+                    continue
+                mean = sum(guesses * count for guesses, count in counts.items()) / games
+                p50, p95, p99 = (_percentile(counts, games, q) for q in (50, 95, 99))
+                print(f"{spec:<14} {pairs:>5} {games:>9} {mean:>8.2f} {p50:>5} {p95:>5} {p99:>5}")
+        if self._workers:
+            print(f"\n{'worker':<8} {'chunks':>7} {'games':>9} {'games/s':>10}")
+            total = 0
+            for i, (chunks, games, seconds) in enumerate(self._workers.values(), 1):
+                total += games
+                print(f"{i:<8} {chunks:>7} {games:>9} {games / seconds if seconds else 0:>10.0f}")
+            print(f"{'all':<8} {'':>7} {total:>9} {total / self._seconds if self._seconds else 0:>10.0f}")
+
+
+def _percentile(counts: typing.Dict[int, int], games: int, q: float) -> int:
+    """Returns the smallest number of guesses within which at least q percent of the games were won."""
+    seen = 0
+    for guesses in sorted(counts):
+        seen += counts[guesses]
+        if seen >= games * q / 100:
+            return guesses
+    return max(counts)
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Play bots against many boards across worker processes.")
+    parser.add_argument('--bots', nargs='+', default=['random', 'perfect', 'limited:0.1'],
+                        help="'random', 'perfect' or 'limited:P', forgetting each card with probability P per guess")
+    parser.add_argument('--pairs', nargs='+', type=int, default=list(cfg.PAIRS_BY_DIFFICULTY.values()))
+    parser.add_argument('--games', type=int, default=10_000, help="games per bot and board size")
+    parser.add_argument('--chunk', type=int, default=1000, help="games per unit of work")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes; defaults to the CPU count")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--checkpoint', default=None, help="JSON file to save progress to and resume from")
+    args = parser.parse_args(argv)
+    tournament = Tournament(args.bots, args.pairs, args.games, args.chunk, args.seed, args.checkpoint)
+    tournament.run(args.workers)
+    tournament.report()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
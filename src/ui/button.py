@@ -1,12 +1,21 @@
 import typing
+import collections
 import pygame as pg
 
+import src.config as cfg
 import src.services.text as text_renderer
 import src.input.input_manager as input_manager
-import src.utils.helpers as helpers
 from src.input.input_state import InputState
 from src.animated_sprite import AnimatedSprite
 
+# Least-recently-used cache of button images with their text rendered, keyed by (text, size, color, image files).
+_rendered_images = collections.OrderedDict()
+
+
+def clear_cache() -> None:
+    """Forgets every cached button image, so the next buttons render their text again."""
+    _rendered_images.clear()
+
 
 class Button(AnimatedSprite):
     """Represents a button sprite that, upon click, runs some action."""
@@ -28,23 +37,39 @@ class Button(AnimatedSprite):
             {'start_frame': Button._CLICKED, 'num_frames': 1}
         ]
         AnimatedSprite.__init__(self, img_files, frame_info, all_groups)
-        # Add Text to buttons.
-        for i in range(len(self._images)):
-            # Make a copy to safely alter image with text.
-            self._images[i] = self._images[i].copy()
-            text_renderer.render(self._images[i], text, size, color)
+        # Add Text to buttons, reusing the images of an earlier button with the same text and look.
+        key = (text, size, tuple(color), tuple(img_files))
+        images = _rendered_images.get(key)
+        if images is None:
+            # Images from the loader are shared views; make a copy to safely alter image with text.
+            images = [image.copy() for image in self._images]
+            for image in images:
+                text_renderer.render(image, text, size, color)
+            _rendered_images[key] = images
+            while len(_rendered_images) > cfg.MENU_CACHE_SIZE:
+                _rendered_images.popitem(last=False)
+        else:
+            _rendered_images.move_to_end(key)
+        # Shared with other buttons, so they must not be drawn onto.
+        self._images = images
+        self.change_anim(Button._HOVER_OFF)
         # on-click button function
         self._action = action
+        # Screen area that must be redrawn because the button's image changed since it was last drawn.
+        self._dirty_rect = None
 
-    def handle_mouse(self):
-        """Either animates the button or executes the function that it encapsulates."""
+    def handle_mouse(self, hovering: bool):
+        """Either animates the button or executes the function that it encapsulates.
+
+        :param hovering: Whether the mouse is over the button, as determined by the menu's layout.
+        """
         # Keep track of bottom of button.
         old_bot = self.rect.bottomleft
-        mouse_x, mouse_y = pg.mouse.get_pos()
+        old_image, old_rect = self.image, self.rect
 
         # See if a mouse click was registered and has not been processed.
         mouse_state = input_manager.mouse_state.get(InputState.MOUSE_LEFT, None)
-        if mouse_state and helpers.is_hovering(self, mouse_x, mouse_y):
+        if mouse_state and hovering:
             self.change_anim(Button._HOVER_ON)
             if mouse_state == InputState.STILL_PRESSED:
                 self.change_anim(Button._CLICKED)
@@ -58,3 +83,11 @@ class Button(AnimatedSprite):
         # Update button position
         self.rect = self.image.get_rect()
         self.rect.bottomleft = old_bot
+        if self.image is not old_image:
+            dirty_rect = old_rect.union(self.rect)
+            self._dirty_rect = self._dirty_rect.union(dirty_rect) if self._dirty_rect else dirty_rect
+
+    def pop_dirty_rect(self) -> typing.Optional[pg.Rect]:
+        """Returns the screen area covered by the button's old and new images if it changed, and forgets it."""
+        dirty_rect, self._dirty_rect = self._dirty_rect, None
+        return dirty_rect
@@ -1,12 +1,26 @@
+import typing
+import collections
 import pygame as pg
 
 import src.config as cfg
+import src.input.input_state as input_state
 import src.services.text as text_renderer
 from src.base_sprite import BaseSprite
+from src.utils.layout import SpatialHash
+import src.ui.button as ui_button
 from src.ui.button import Button
 
 
 _BTN_IMAGES = ["blue_button04.png", "blue_button02.png", "blue_button03.png"]
+# Least-recently-used cache of panel images, resized and with their title rendered, keyed by
+# (title, size, color, width, height).
+_panel_images = collections.OrderedDict()
+
+
+def clear_cache() -> None:
+    """Forgets every cached panel and button image, so the next menus are built from scratch."""
+    _panel_images.clear()
+    ui_button.clear_cache()
 
 
 class Menu(BaseSprite):
@@ -28,17 +42,26 @@ class Menu(BaseSprite):
         # Resize menu surface
         width = (self.buttons[0].rect.w + Menu._BUTTON_PADDING * 2)
         height = (self.buttons[0].rect.h + Menu._BUTTON_PADDING) * (len(self.buttons) + 1)
-        self.image = pg.transform.scale(self.image, (width, height))
-        self.image.set_colorkey(cfg.BLACK)
+        key = (title, size, tuple(color), width, height)
+        image = _panel_images.get(key)
+        if image is None:
+            image = pg.transform.scale(self.image, (width, height))
+            image.set_colorkey(cfg.BLACK)
+            # Render menu title
+            text_renderer.render_pos(image, x=width/2, y=2 * Menu._BUTTON_PADDING,
+                                     text=title, size=size, color=color)
+            _panel_images[key] = image
+            while len(_panel_images) > cfg.MENU_CACHE_SIZE:
+                _panel_images.popitem(last=False)
+        else:
+            _panel_images.move_to_end(key)
+        # Shared with other menus made from the same spec, so it must not be drawn onto.
+        self.image = image
 
         # Recenter menu surface
         self.rect = self.image.get_rect()
         self.rect.center = (cfg.SCREEN_WIDTH / 2, cfg.SCREEN_HEIGHT / 2)
 
-        # Render menu title
-        text_renderer.render_pos(self.image, x=self.rect.w/2, y=2 * Menu._BUTTON_PADDING,
-                                 text=title, size=size, color=color)
-
         # Position buttons
         menu_offset = size * 2 + self.rect.top
         for i in range(len(self.buttons)):
@@ -46,17 +69,40 @@ class Menu(BaseSprite):
             self.buttons[i].rect.top = menu_offset + i * (self.buttons[i].rect.h + Menu._BUTTON_PADDING)
             self.buttons[i].rect.centerx = cfg.SCREEN_WIDTH / 2
 
+        # Index the buttons by position so a click is matched to its button without checking each one.
+        self._button_layout = SpatialHash(self.buttons[0].rect.h)
+        for i, button in enumerate(self.buttons):
+            self._button_layout.insert(i, button.rect)
+
     def handle_mouse(self) -> None:
         """Handles mouse by delegating to its buttons."""
-        for button in self.buttons:
-            button.handle_mouse()
+        hovered = self._button_layout.index_at(*input_state.get_mouse_pos())
+        for i, button in enumerate(self.buttons):
+            button.handle_mouse(i == hovered)
 
     def draw(self, surface: pg.Surface) -> None:
         """Draws the menu onto the surface provided."""
         surface.blit(self.image, self.rect)
         for button in self.buttons:
+            button.pop_dirty_rect()
             surface.blit(button.image, button.rect)
 
+    def draw_dirty(self, surface: pg.Surface) -> typing.List[pg.Rect]:
+        """Redraws only the buttons whose images changed since they were last drawn.
+
+        :param surface: Surface on which the whole menu was previously drawn.
+        :return: Areas of the surface that were redrawn.
+        """
+        rects = []
+        for button in self.buttons:
+            rect = button.pop_dirty_rect()
+            if rect:
+                # Restore the panel behind the button, since its old image may have been larger.
+                surface.blit(self.image, rect, rect.move(-self.rect.x, -self.rect.y))
+                surface.blit(button.image, button.rect)
+                rects.append(rect)
+        return rects
+
     def kill(self) -> None:
         """Stop drawing all of the buttons and the menu itself."""
         for button in self.buttons:
@@ -1,3 +1,4 @@
+import typing
 import pygame as pg
 
 from src.ui.menu import Menu
@@ -7,10 +8,23 @@ class UI:
     def __init__(self):
         self._ui_sprites = pg.sprite.Group()
         self._menus = []
+        # Whether menus were added or removed since the UI was last fully drawn.
+        self._changed = False
+
+    @property
+    def changed(self) -> bool:
+        """Whether menus were added or removed since the last call to draw, so that what is under them is stale."""
+        return self._changed
+
+    @property
+    def top_menu(self) -> typing.Optional[Menu]:
+        """Returns the menu that handles the mouse, or None if no menu is shown."""
+        return self._menus[-1] if self._menus else None
 
     def make_menu(self, title, size, color, buttons):
         """Creates a menu and presents it as the UI's topmost element."""
         self._menus.append(Menu(title, size, color, buttons, self._ui_sprites))
+        self._changed = True
 
     def process_inputs(self):
         """Handles the mouse by delegating to the topmost menu."""
@@ -21,13 +35,29 @@ class UI:
         """Removes the topmost menu."""
         menu = self._menus.pop()
         menu.kill()
+        self._changed = True
 
     def clear(self):
         """Clears all menus from the UI."""
         while self._menus:
             self.pop_menu()
 
+    def covers(self, rects: typing.List[pg.Rect]) -> bool:
+        """Whether any menu overlaps any of the given areas, so that drawing there would draw over the menu."""
+        return any(menu.rect.collidelist(rects) != -1 for menu in self._menus)
+
     def draw(self, surface: pg.Surface):
         """Draw all menus from bottom to top."""
         for menu in self._menus:
             menu.draw(surface)
+        self._changed = False
+
+    def draw_dirty(self, surface: pg.Surface) -> typing.List[pg.Rect]:
+        """Redraws only the buttons that changed since the UI was last drawn, and returns the areas redrawn.
+
+        Only valid when the UI has not changed; otherwise, call draw.
+        """
+        rects = []
+        for menu in self._menus:
+            rects.extend(menu.draw_dirty(surface))
+        return rects
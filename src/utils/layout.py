@@ -0,0 +1,75 @@
+"""Layouts that map a screen position to the index of the item under it without checking every item."""
+import typing
+import pygame as pg
+
+
+class GridLayout:
+    """Items of equal size laid out row by row on a regular grid."""
+    def __init__(self, left: int, top: int, cell_width: int, cell_height: int, columns: int, count: int):
+        """
+
+        :param left: X coordinate of the grid's left edge.
+        :param top: Y coordinate of the grid's top edge.
+        :param cell_width: Width of each item.
+        :param cell_height: Height of each item.
+        :param columns: Number of items in each row.
+        :param count: Total number of items; the last row may be partially filled.
+        """
+        self._left, self._top = left, top
+        self._cell_width, self._cell_height = cell_width, cell_height
+        self._columns = columns
+        self._count = count
+
+    def cell_rect(self, index: int) -> pg.Rect:
+        """Returns the screen rectangle of the item at the given index."""
+        row, col = divmod(index, self._columns)
+        return pg.Rect(self._left + col * self._cell_width, self._top + row * self._cell_height,
+                       self._cell_width, self._cell_height)
+
+    def index_at(self, x: int, y: int) -> typing.Optional[int]:
+        """Returns the index of the item at the given position, or None if there is none."""
+        if x < self._left or y < self._top:
+            return None
+        col = (x - self._left) // self._cell_width
+        row = (y - self._top) // self._cell_height
+        if col >= self._columns:
+            return None
+        index = int(row * self._columns + col)
+        return index if index < self._count else None
+
+
+class SpatialHash:
+    """Items of arbitrary rectangles, bucketed by the square cells of a coarse grid that they overlap."""
+    def __init__(self, cell_size: int = 64):
+        """
+
+        :param cell_size: Side length of each bucket; roughly the size of a typical item works best.
+        """
+        self._cell_size = cell_size
+        self._buckets = {}
+        self._rects = {}
+
+    def insert(self, index: int, rect: pg.Rect) -> None:
+        """Adds an item to the hash.
+
+        :param index: Index of the item, returned by index_at.
+        :param rect: Screen rectangle of the item.
+        :return: None
+        """
+        rect = pg.Rect(rect)
+        self._rects[index] = rect
+        size = self._cell_size
+        for bucket_x in range(rect.left // size, (rect.right - 1) // size + 1):
+            for bucket_y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                self._buckets.setdefault((bucket_x, bucket_y), []).append(index)
+
+    def index_at(self, x: int, y: int) -> typing.Optional[int]:
+        """Returns the index of the item at the given position, or None if there is none.
+
+        When items overlap, the one inserted last wins, as it would be drawn on top.
+        """
+        bucket = self._buckets.get((int(x) // self._cell_size, int(y) // self._cell_size), ())
+        for index in reversed(bucket):
+            if self._rects[index].collidepoint(x, y):
+                return index
+        return None
@@ -0,0 +1,51 @@
+import random
+import collections
+
+import pytest
+
+from src.card import Card
+from src.deck import Deck
+
+
+def test_same_seed_draws_same_cards():
+    assert Deck(rng=random.Random(7)).sample_pairs(8) == Deck(rng=random.Random(7)).sample_pairs(8)
+    assert Deck(rng=random.Random(7)).draw(52) != Deck(rng=random.Random(8)).draw(52)
+
+
+def test_sample_pairs_has_each_id_twice():
+    board = Deck(rng=random.Random(0)).sample_pairs(18)
+    counts = collections.Counter(board)
+    assert len(board) == 36
+    assert len(counts) == 18
+    assert set(counts.values()) == {2}
+
+
+def test_draw_removes_cards():
+    deck = Deck(rng=random.Random(0))
+    drawn = deck.draw(10)
+    assert len(deck) == Card.DECK_SIZE - 10
+    assert sorted(list(drawn) + list(deck.draw(len(deck)))) == list(range(Card.DECK_SIZE))
+    assert len(deck) == 0
+
+
+def test_multiple_decks():
+    deck = Deck(decks=3, rng=random.Random(0))
+    assert len(deck) == 3 * Card.DECK_SIZE
+    counts = collections.Counter(deck.draw(len(deck)))
+    assert len(counts) == Card.DECK_SIZE
+    assert set(counts.values()) == {3}
+
+
+def test_draw_too_many_raises():
+    deck = Deck(rng=random.Random(0))
+    with pytest.raises(ValueError):
+        deck.draw(Card.DECK_SIZE + 1)
+    deck.draw(50)
+    with pytest.raises(ValueError):
+        deck.sample_pairs(3)
+    assert len(deck) == 2
+
+
+def test_no_decks_raises():
+    with pytest.raises(ValueError):
+        Deck(decks=0)
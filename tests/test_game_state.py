@@ -0,0 +1,45 @@
+import pygame as pg
+
+import src.config as cfg
+import src.services.timer as scheduler
+from src.game_state import GamePlayingState
+
+
+def _click(pos) -> None:
+    pg.event.post(pg.event.Event(pg.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+    pg.event.post(pg.event.Event(pg.MOUSEBUTTONDOWN, pos=pos, button=1))
+    pg.event.post(pg.event.Event(pg.MOUSEBUTTONUP, pos=pos, button=1))
+
+
+def _press(key: int) -> None:
+    pg.event.post(pg.event.Event(pg.KEYDOWN, key=key, mod=0))
+    pg.event.post(pg.event.Event(pg.KEYUP, key=key, mod=0))
+
+
+def test_pause_holds_wrong_guess(game):
+    game.state = GamePlayingState(game, cfg.EASY)
+    state = game.state
+    game.frame()
+    board = state.memory_game.board
+    first, second = 0, next(i for i in range(1, len(board)) if board[i] != board[0])
+    for index in (first, second):
+        _click(state.card_rect(index).center)
+        game.frame()
+    assert state.memory_game.mismatch
+
+    _press(pg.K_p)
+    game.frame()
+    assert state.paused
+    paused_screen = pg.image.tostring(game.screen, 'RGB')
+    # The wrong guess would have flipped back by now, had it not been held.
+    scheduler.update(cfg.MISMATCH_REVEAL_TIME)
+    game.frame()
+    assert pg.image.tostring(game.screen, 'RGB') == paused_screen
+    assert state.memory_game.is_revealed(first) and state.memory_game.is_revealed(second)
+
+    _press(pg.K_p)
+    game.frame()
+    assert not state.paused
+    scheduler.update(cfg.MISMATCH_REVEAL_TIME)
+    game.frame()
+    assert not state.memory_game.is_revealed(first) and not state.memory_game.is_revealed(second)
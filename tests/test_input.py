@@ -0,0 +1,38 @@
+import pygame as pg
+
+import src.config as cfg
+import src.input.input_manager as input_manager
+import src.input.input_state as input_state
+
+
+class _EventLog:
+    """Input session that keeps the events of each frame, in the order the states are given them."""
+    def __init__(self):
+        self.frames = []
+
+    def begin_frame(self, dt: float) -> float:
+        return dt
+
+    def events(self, events):
+        self.frames.append([event.type for event in events])
+        return events
+
+
+def test_idle_wait_keeps_event_order(game, monkeypatch):
+    monkeypatch.setattr(cfg, 'IDLE_WAIT', True)
+    game.state = game.main_menu_state
+    game.frame()
+    assert game.state.is_idle()
+
+    log = _EventLog()
+    input_manager.set_session(log)
+    try:
+        # Away from the menu's buttons, so the click does nothing but press and release the mouse.
+        pg.event.post(pg.event.Event(pg.MOUSEBUTTONDOWN, pos=(1, 1), button=1))
+        pg.event.post(pg.event.Event(pg.MOUSEBUTTONUP, pos=(1, 1), button=1))
+        game.frame()
+    finally:
+        input_manager.set_session(None)
+    assert log.frames[-1] == [pg.MOUSEBUTTONDOWN, pg.MOUSEBUTTONUP]
+    assert not input_state.any_mouse_pressed()
+    assert game.state.is_idle()
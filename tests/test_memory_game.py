@@ -0,0 +1,57 @@
+import random
+
+from src.memory_game import MemoryGame
+
+
+def test_scripted_win():
+    game = MemoryGame([0, 1, 1, 0])
+    assert game.flip(0) == MemoryGame.FIRST
+    assert game.flip(3) == MemoryGame.MATCH
+    assert not game.is_won
+    assert game.flip(1) == MemoryGame.FIRST
+    assert game.flip(2) == MemoryGame.MATCH
+    assert game.is_won
+    assert game.guesses == 2
+    assert game.pairs_left == 0
+    assert list(game.states) == [MemoryGame.MATCHED] * 4
+
+
+def test_mismatch_then_hide():
+    game = MemoryGame([0, 1, 1, 0])
+    game.flip(0)
+    assert game.flip(1) == MemoryGame.MISMATCH
+    assert game.mismatch == (0, 1)
+    assert game.is_revealed(0) and game.is_revealed(1)
+    assert game.hide_mismatch() == (0, 1)
+    assert game.mismatch == ()
+    assert not game.is_revealed(0) and not game.is_revealed(1)
+    assert game.hide_mismatch() == ()
+    assert game.guesses == 1
+    assert game.pairs_left == 2
+
+
+def test_flip_hides_mismatch_first():
+    game = MemoryGame([0, 1, 1, 0])
+    game.flip(0)
+    game.flip(1)
+    assert game.flip(2) == MemoryGame.FIRST
+    assert not game.is_revealed(0) and not game.is_revealed(1)
+
+
+def test_flip_face_up_card_is_ignored():
+    game = MemoryGame([0, 1, 1, 0])
+    game.flip(0)
+    assert game.flip(0) == MemoryGame.IGNORED
+    game.flip(3)
+    assert game.flip(0) == MemoryGame.IGNORED
+    assert game.flip(3) == MemoryGame.IGNORED
+    assert game.guesses == 1
+    assert game.states[0] == game.states[3] == MemoryGame.MATCHED
+
+
+def test_same_seed_deals_same_board():
+    first = MemoryGame.deal(8, random.Random(42))
+    second = MemoryGame.deal(8, random.Random(42))
+    assert first.board == second.board
+    assert sorted(first.board) == sorted(list(range(8)) * 2)
+    assert MemoryGame.deal(8, random.Random(43)).board != first.board